@@ -0,0 +1,235 @@
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+from typing import Dict, List
+
+from parallel import _encode_chunk, _init_worker
+from tokenizer import Tokenizer
+
+
+def _encode_texts(tokenizer: Tokenizer, texts: List[str],
+                  add_special_tokens: bool, truncate: bool) -> List[List[int]]:
+    return [tokenizer.encode_fast(text, add_special_tokens=add_special_tokens,
+                                  truncate=truncate)
+            for text in texts]
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+class AsyncTokenizer:
+    """
+    Encodes texts for asyncio code without blocking the event loop.
+    Concurrent calls to encode are collected into micro-batches, each
+    sent to a worker once it has maxBatchSize texts or its oldest text
+    has waited maxDelay seconds, whichever comes first. Each caller
+    gets the ids of its own text.
+
+    By default batches run on a single worker thread. Since encoding
+    holds the GIL, processes > 0 runs them on that many worker
+    processes instead (the tokenizer is sent to each of them once, as
+    with ParallelEncoder), which is what to use when the service is
+    CPU bound.
+
+    Attributes:
+        tokenizer (Tokenizer): The tokenizer to encode with. With
+                               processes > 0, changes made to it after
+                               the workers start are not seen by them.
+        maxBatchSize (int): Most texts in a batch. Default is 64.
+        maxDelay (float): Most seconds a text waits for its batch to
+                          fill up. Default is 0.002.
+        processes (int): Number of worker processes, or 0 for one
+                         worker thread. Default is 0.
+
+    For example,
+        >>> from tokenizer import Tokenizer
+        >>> from asynctokenizer import AsyncTokenizer
+        >>> tokenizer = Tokenizer()
+        >>> tokenizer.load_tokenizer('ToyVocab.txt')
+        >>> async def main():
+        ...     async with AsyncTokenizer(tokenizer) as encoder:
+        ...         return await asyncio.gather(encoder.encode('the cat'),
+        ...                                     encoder.encode('the cat eats'))
+        >>> asyncio.run(main())
+        >>> [[0, 2], [0, 2, 4]]
+    """
+
+    def __init__(self, tokenizer: Tokenizer,
+                 maxBatchSize: int = 64,
+                 maxDelay: float = 0.002,
+                 processes: int = 0):
+        if maxBatchSize < 1:
+            raise ValueError('maxBatchSize must be at least 1')
+        self.tokenizer = tokenizer
+        self.maxBatchSize = maxBatchSize
+        self.maxDelay = maxDelay
+        self.processes = processes
+        self._executor = None
+        self._pending = []
+        self._timer = None
+        self._batches = set()
+        self.reset_stats()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @property
+    def executor(self):
+        """
+        The worker thread or process pool, started on first use.
+        """
+        if self._executor is None:
+            if self.processes > 0:
+                self._executor = ProcessPoolExecutor(self.processes,
+                                                     initializer=_init_worker,
+                                                     initargs=(self.tokenizer,))
+            else:
+                self._executor = ThreadPoolExecutor(1)
+        return self._executor
+
+    async def start(self):
+        """
+        Starts the worker processes (if any). They are forked, so start
+        them before opening any sockets (e.g., before the server starts
+        listening): a forked worker keeps copies of the connections open
+        in the parent, and closing those then never reaches the client.
+        async with calls this on entry.
+        """
+        if self.processes > 0:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*[loop.run_in_executor(self.executor, _encode_chunk,
+                                                        ([], False, False))
+                                   for _ in range(self.processes)])
+
+    async def close(self):
+        """
+        Sends any waiting texts, waits for every batch to finish and
+        shuts down the workers.
+        """
+        self._flush()
+        if self._batches:
+            await asyncio.gather(*self._batches, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def encode(self, text: str,
+                     add_special_tokens: bool = False,
+                     truncate: bool = False) -> List[int]:
+        """
+        Encodes text in the next micro-batch. Returns the same as
+        tokenizer.encode_fast(text, ...).
+
+        Args:
+            text (str): Text to encode.
+            add_special_tokens (bool): Whether to add eos and bos.
+            truncate (bool): Whether to truncate to maxSequenceLength.
+
+        Returns:
+            List[int]: The ids of text.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, add_special_tokens, truncate, future, perf_counter()))
+        if self._firstRequest is None:
+            self._firstRequest = perf_counter()
+        if len(self._pending) >= self.maxBatchSize:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.maxDelay, self._flush)
+        return await future
+
+    def _flush(self):
+        """
+        Starts encoding the waiting texts as one batch.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run(self, batch):
+        """
+        Encodes a batch (one job per combination of options) and
+        resolves the future of each text in it.
+        """
+        loop = asyncio.get_running_loop()
+        groups = {}
+        for request in batch:
+            groups.setdefault(request[1:3], []).append(request)
+
+        start = perf_counter()
+        for (add_special_tokens, truncate), requests in groups.items():
+            texts = [request[0] for request in requests]
+            try:
+                if self.processes > 0:
+                    rows = await loop.run_in_executor(
+                        self.executor, _encode_chunk, (texts, add_special_tokens, truncate))
+                else:
+                    rows = await loop.run_in_executor(
+                        self.executor, _encode_texts, self.tokenizer, texts,
+                        add_special_tokens, truncate)
+            except Exception as error:
+                for request in requests:
+                    if not request[3].done():
+                        request[3].set_exception(error)
+                continue
+            done = perf_counter()
+            for request, row in zip(requests, rows):
+                if not request[3].done():
+                    request[3].set_result(row)
+                self._latencies.append(done - request[4])
+
+        self._batchSeconds += perf_counter() - start
+        self._requests += len(batch)
+        self._numBatches += 1
+        self._lastResult = perf_counter()
+
+    def stats(self) -> Dict:
+        """
+        Returns latency and throughput counters since the last
+        reset_stats: the number of requests and batches, the mean batch
+        size, the 50th/95th/99th percentile and maximum latency (from
+        the call to encode until its ids are ready) in milliseconds over
+        the last 10000 requests, the requests per second, and the mean
+        milliseconds from sending a batch to the workers until its ids
+        are back.
+        """
+        latencies = list(self._latencies)
+        elapsed = (self._lastResult - self._firstRequest) \
+            if self._firstRequest is not None and self._lastResult is not None else 0.0
+        return {'requests': self._requests,
+                'batches': self._numBatches,
+                'mean_batch_size': self._requests / self._numBatches if self._numBatches else 0.0,
+                'latency_ms': {'p50': 1000 * _percentile(latencies, 0.50),
+                               'p95': 1000 * _percentile(latencies, 0.95),
+                               'p99': 1000 * _percentile(latencies, 0.99),
+                               'max': 1000 * max(latencies, default=0.0)},
+                'throughput': self._requests / elapsed if elapsed else 0.0,
+                'mean_batch_ms': 1000 * self._batchSeconds / self._numBatches
+                if self._numBatches else 0.0}
+
+    def reset_stats(self):
+        """
+        Zeroes the counters reported by stats.
+        """
+        self._latencies = deque(maxlen=10000)
+        self._requests = 0
+        self._numBatches = 0
+        self._batchSeconds = 0.0
+        self._firstRequest = None
+        self._lastResult = None
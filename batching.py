@@ -0,0 +1,136 @@
+from typing import Dict, List, Tuple
+
+from tokenizer import Tokenizer, _pad_rows
+
+
+class BucketedBatcher:
+    """
+    Encodes texts into batches of similar length, so that padding each
+    batch to its own longest row wastes little. Texts are encoded once,
+    and their ids give the lengths to group by: rows are ordered by
+    length (ties keep input order) and cut greedily into batches whose
+    padded size, rows times longest row, stays within a token budget.
+    A row longer than the budget gets a batch of its own. Short rows
+    therefore come in large batches and long rows in small ones.
+
+    Attributes:
+        tokenizer (Tokenizer): The tokenizer to encode with.
+        maxTokens (int): Most ids (padding included) in a batch.
+                         Default is 4096.
+        maxBatchSize (int): Most rows in a batch, or None for no limit.
+                            Default is None.
+
+    For example,
+        >>> from tokenizer import Tokenizer
+        >>> from batching import BucketedBatcher
+        >>> tokenizer = Tokenizer()
+        >>> tokenizer.load_tokenizer('ToyVocab.txt')
+        >>> batcher = BucketedBatcher(tokenizer, maxTokens=6)
+        >>> batches, indices = batcher.batch(['the cat eats', 'the', 'cat', 'the cat'])
+        >>> batches
+        >>> [[[0, 9], [2, 9], [0, 2]], [[0, 2, 4]]]
+        >>> indices
+        >>> [[1, 2, 3], [0]]
+    """
+
+    def __init__(self, tokenizer: Tokenizer,
+                 maxTokens: int = 4096,
+                 maxBatchSize: int = None):
+        if maxTokens < 1:
+            raise ValueError('maxTokens must be at least 1')
+        self.tokenizer = tokenizer
+        self.maxTokens = maxTokens
+        self.maxBatchSize = maxBatchSize
+        self._stats = {}
+
+    def batch(self, texts: List[str],
+              add_special_tokens: bool = False,
+              truncate: bool = False) -> Tuple[List[List[List[int]]], List[List[int]]]:
+        """
+        Encodes texts (as by tokenizer.encode_fast) into padded batches
+        under the token budget.
+
+        Args:
+            texts (List[str]): Texts to encode.
+            add_special_tokens (bool): Whether to add eos and bos to each text.
+            truncate (bool): Whether to truncate each text to
+                             maxSequenceLength.
+
+        Returns:
+            Tuple[List[List[List[int]]], List[List[int]]]: The batches,
+                each a list of rows padded to its longest row, and for
+                each batch the index in texts of each of its rows
+                (see restore).
+        """
+        rows = [self.tokenizer.encode_fast(text, add_special_tokens=add_special_tokens,
+                                           truncate=truncate)
+                for text in texts]
+        lengths = [len(row) for row in rows]
+        order = sorted(range(len(rows)), key=lengths.__getitem__)
+
+        indices = []
+        current = []
+        for idx in order:
+            # order is by length, so this row is the longest in the batch
+            if current and ((len(current) + 1) * lengths[idx] > self.maxTokens
+                            or len(current) == self.maxBatchSize):
+                indices.append(current)
+                current = []
+            current.append(idx)
+        if current:
+            indices.append(current)
+
+        pad = self.tokenizer._pad_id()
+        batches = []
+        for batchIndices in indices:
+            batch = [rows[idx] for idx in batchIndices]
+            _pad_rows(batch, pad)
+            batches.append(batch)
+
+        self._stats = self._efficiency(lengths, batches)
+        return batches, indices
+
+    def _efficiency(self, lengths: List[int], batches) -> Dict:
+        real = sum(lengths)
+        padded = sum(len(batch) * len(batch[0]) for batch in batches)
+        naive = len(lengths) * max(lengths, default=0)
+        return {'texts': len(lengths),
+                'batches': len(batches),
+                'tokens': real,
+                'padded_tokens': padded,
+                'efficiency': real / padded if padded else 1.0,
+                'unbucketed_efficiency': real / naive if naive else 1.0}
+
+    def stats(self) -> Dict:
+        """
+        Returns padding statistics of the last call to batch: the number
+        of texts and batches, the number of real ids, the number of ids
+        including padding, the efficiency (the fraction of ids that are
+        real), and the efficiency of padding all texts as one batch
+        instead.
+        """
+        return dict(self._stats)
+
+    @staticmethod
+    def restore(outputs: List[List], indices: List[List[int]]) -> List:
+        """
+        Puts per-row outputs of the batches (e.g., the batches
+        themselves, or model outputs for them) back in input order.
+
+        Args:
+            outputs (List[List]): For each batch, one output per row.
+            indices (List[List[int]]): The indices returned by batch.
+
+        Returns:
+            List: The output of each text, in the order of texts.
+
+        For example,
+            >>> batches, indices = batcher.batch(texts)
+            >>> BucketedBatcher.restore(batches, indices)[0]
+            >>> # texts[0]'s padded row
+        """
+        restored = [None] * sum(map(len, indices))
+        for batchOutputs, batchIndices in zip(outputs, indices):
+            for output, idx in zip(batchOutputs, batchIndices):
+                restored[idx] = output
+        return restored
@@ -0,0 +1,124 @@
+from benchmarks.encode_fast_bench import benchEncodeFast
+from benchmarks.parallel_bench import benchParallelEncoder
+from benchmarks.create_vocab_bench import benchCreateVocab, benchUpdateVocab, \
+    benchThresholdSweep
+from benchmarks.load_bench import benchLoadTokenizer
+from benchmarks.decode_bench import benchDecode, benchDecodeToText
+from benchmarks.added_tokens_bench import benchAddedTokens
+from benchmarks.bpe_bench import benchBPE
+from benchmarks.async_bench import benchAsyncTokenizer
+from benchmarks.bucketing_bench import benchBucketedBatcher
+from benchmarks.lookup_bench import benchLookup
+from benchmarks.truncation_bench import benchTruncation
+from benchmarks.count_tokens_bench import benchCountTokens
+from benchmarks.dedup_bench import benchDedup
+from benchmarks.pipeline_bench import benchDataPipeline
+from benchmarks.suite import benchSuite
+import argparse
+import sys
+
+parser = argparse.ArgumentParser(prog='bench.py', 
+                                 description='Benchmark your tokenizer')
+
+
+parser.add_argument('--bench',
+                    default='all',
+                    nargs='?',
+                    choices=['encode_fast', 'parallel', 'create', 
+                             'load', 'decode', 'added_tokens', 'bpe', 'async',
+                             'bucketing', 'lookup', 'truncation', 'count', 'dedup',
+                             'pipeline', 'suite', 'all'],
+                    help='run benchmark of encode_fast, parallel, create, '\
+                    'load, decode, added_tokens, bpe, async, bucketing, '\
+                    'lookup, truncation, count, dedup, pipeline, suite, '\
+                    'or all (default: all)')
+parser.add_argument('--size',
+                    default=[1],
+                    nargs='+',
+                    type=float,
+                    help='corpus sizes in MB for the suite, e.g. 1 100 1024 '\
+                    '(default: 1)')
+parser.add_argument('--seed',
+                    default=0,
+                    type=int,
+                    help='seed of the synthetic suite corpora (default: 0)')
+parser.add_argument('--baseline',
+                    help='baseline JSON to compare the suite against; '\
+                    'exits with status 1 on a regression')
+parser.add_argument('--save-baseline',
+                    help='save the suite results as a baseline JSON')
+parser.add_argument('--tolerance',
+                    default=0.2,
+                    type=float,
+                    help='allowed fractional throughput drop against '\
+                    'the baseline (default: 0.2)')
+
+args = parser.parse_args()
+
+if args.bench == 'encode_fast' or args.bench == 'all':
+    print('Benchmarking encode_fast()...')
+    benchEncodeFast()
+
+if args.bench == 'parallel' or args.bench == 'all':
+    print('Benchmarking ParallelEncoder...')
+    benchParallelEncoder()
+
+if args.bench == 'create' or args.bench == 'all':
+    print('Benchmarking create_vocab()...')
+    benchCreateVocab()
+    print('Benchmarking update_vocab()...')
+    benchUpdateVocab()
+    print('Benchmarking threshold_sweep()...')
+    benchThresholdSweep()
+
+if args.bench == 'load' or args.bench == 'all':
+    print('Benchmarking load_tokenizer()...')
+    benchLoadTokenizer()
+
+if args.bench == 'decode' or args.bench == 'all':
+    print('Benchmarking decode()...')
+    benchDecode()
+    print('Benchmarking decode_to_text()...')
+    benchDecodeToText()
+
+if args.bench == 'added_tokens' or args.bench == 'all':
+    print('Benchmarking add_tokens()...')
+    benchAddedTokens()
+
+if args.bench == 'bpe' or args.bench == 'all':
+    print('Benchmarking create_bpe_vocab()...')
+    benchBPE()
+
+if args.bench == 'async' or args.bench == 'all':
+    print('Load testing AsyncTokenizer...')
+    benchAsyncTokenizer()
+
+if args.bench == 'bucketing' or args.bench == 'all':
+    print('Benchmarking BucketedBatcher...')
+    benchBucketedBatcher()
+
+if args.bench == 'lookup' or args.bench == 'all':
+    print('Benchmarking convert_tokens_to_ids()...')
+    benchLookup()
+
+if args.bench == 'truncation' or args.bench == 'all':
+    print('Benchmarking truncation...')
+    benchTruncation()
+
+if args.bench == 'count' or args.bench == 'all':
+    print('Benchmarking count_tokens...')
+    benchCountTokens()
+
+if args.bench == 'dedup' or args.bench == 'all':
+    print('Benchmarking batch deduplication...')
+    benchDedup()
+
+if args.bench == 'pipeline' or args.bench == 'all':
+    print('Benchmarking DataPipeline...')
+    benchDataPipeline()
+
+if args.bench == 'suite' or args.bench == 'all':
+    print('Running benchmark suite...')
+    if not benchSuite(args.size, seed=args.seed, baseline=args.baseline,
+                      saveBaseline=args.save_baseline, tolerance=args.tolerance):
+        sys.exit(1)
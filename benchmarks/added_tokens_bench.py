@@ -0,0 +1,28 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+from benchmarks.common import makeText, bestOf
+
+
+def benchAddedTokens(numWords: int = 200000, counts=(0, 10, 1000, 10000)):
+
+    text = makeText(numWords)
+    rng = random.Random(0)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+
+    print(f'encode_fast on {len(text):,} characters')
+    for count in counts:
+        tokenizer = T.Tokenizer()
+        tokenizer.load_tokenizer('./tests/TestVocab.txt')
+        if count:
+            tokenizer.add_tokens(['<' + ''.join(rng.choices(letters, k=rng.randint(3, 12))) + '>'
+                                  for _ in range(count // 2)] +
+                                 [' '.join(rng.choices(['the', 'man', 'tall', 'who'], k=3))
+                                  for _ in range(count - count // 2)])
+        seconds = bestOf(lambda: tokenizer.encode_fast(text))
+        print(f'  {count:6d} added tokens: {len(text) / seconds:14,.0f} chars/s')
+
+
+if __name__ == '__main__':
+    benchAddedTokens()
@@ -0,0 +1,91 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import asynctokenizer as A
+import asyncio
+import time
+from benchmarks.common import makeTexts
+
+# A load test against a local stand-in for the tokenization service: a
+# line-based TCP server that reads one text per line and writes back its
+# ids, space separated. Clients keep a fixed number of requests in
+# flight, and each server variant is measured from the client side.
+
+
+async def serve(encode, handlers):
+    async def handle(reader, writer):
+        handlers.append(asyncio.current_task())
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            ids = await encode(line.decode('utf-8').rstrip('\n'))
+            writer.write((' '.join(map(str, ids)) + '\n').encode('utf-8'))
+        writer.close()
+        await writer.wait_closed()
+    return await asyncio.start_server(handle, '127.0.0.1', 0)
+
+
+async def client(port, texts, latencies):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for text in texts:
+        start = time.perf_counter()
+        writer.write((text.replace('\n', ' ') + '\n').encode('utf-8'))
+        await reader.readline()
+        latencies.append(time.perf_counter() - start)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def loadTest(encode, texts, concurrency):
+    handlers = []
+    server = await serve(encode, handlers)
+    port = server.sockets[0].getsockname()[1]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[client(port, texts[i::concurrency], latencies)
+                           for i in range(concurrency)])
+    seconds = time.perf_counter() - start
+    await asyncio.gather(*handlers)
+    server.close()
+    await server.wait_closed()
+    return seconds, latencies
+
+
+def benchAsyncTokenizer(numTexts: int = 5000, maxWords: int = 200,
+                        concurrency: int = 64):
+
+    tokenizer = T.Tokenizer()
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    texts = makeTexts(numTexts, maxWords)
+
+    async def blocking(text):
+        return tokenizer(text)
+
+    async def run(name, encode, encoder=None):
+        seconds, latencies = await loadTest(encode, texts, concurrency)
+        latencies.sort()
+        print(f'  {name:32s} {numTexts / seconds:10,.0f} requests/s  '
+              f'p50 {1000 * latencies[len(latencies) // 2]:7.2f} ms  '
+              f'p99 {1000 * latencies[int(0.99 * len(latencies))]:7.2f} ms')
+        if encoder is not None:
+            stats = encoder.stats()
+            print(f'  {"":32s} mean batch {stats["mean_batch_size"]:5.1f}  '
+                  f'mean batch time {stats["mean_batch_ms"]:6.2f} ms')
+
+    async def main():
+        print(f'load test with {numTexts} requests, {concurrency} concurrent clients')
+        await run('blocking __call__', blocking)
+        for maxBatchSize, processes in ((1, 0), (64, 0), (64, os.cpu_count() or 1)):
+            async with A.AsyncTokenizer(tokenizer, maxBatchSize=maxBatchSize,
+                                        processes=processes) as encoder:
+                workers = f'{processes} processes' if processes else '1 thread'
+                await run(f'AsyncTokenizer batch {maxBatchSize}, {workers}',
+                          lambda text: encoder.encode(text, add_special_tokens=True),
+                          encoder)
+
+    asyncio.run(main())
+
+
+if __name__ == '__main__':
+    benchAsyncTokenizer()
@@ -0,0 +1,38 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import tempfile
+from benchmarks.common import makeCorpus, bestOf
+
+
+def benchBPE(megabytes: float = 5, vocabSizes=(500, 1000, 2000, 4000, 8000)):
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        makeCorpus(fname, megabytes)
+        with open(fname) as f:
+            lines = f.readlines()
+        words = T.Tokenizer()
+        words.create_vocab(fname, freqThreshold=1)
+        unknown = words.unk_token_id
+
+        print(f'create_bpe_vocab on a {megabytes:g} MB corpus')
+        for vocabSize in vocabSizes:
+            tokenizer = T.Tokenizer()
+            seconds = bestOf(lambda: tokenizer.create_bpe_vocab(fname, vocabSize=vocabSize),
+                             repeat=1)
+            ids = [tokenizer.encode_fast(line) for line in lines]
+            numIds = sum(map(len, ids))
+            numUnk = sum(row.count(tokenizer.unk_token_id) for row in ids)
+            print(f'  vocabSize {vocabSize:5d}: {seconds:6.2f}s to train  '
+                  f'{numIds / sum(map(len, (words.encode_fast(line) for line in lines))):5.2f} '
+                  f'ids/word  {numUnk / numIds:6.2%} <unk>')
+
+        wordIds = [words.encode_fast(line) for line in lines]
+        numIds = sum(map(len, wordIds))
+        numUnk = sum(row.count(unknown) for row in wordIds)
+        print(f'  word level ({len(words)} entries): {numUnk / numIds:6.2%} <unk>')
+
+
+if __name__ == '__main__':
+    benchBPE()
@@ -0,0 +1,37 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import batching as B
+from benchmarks.common import makeTexts, bestOf
+
+
+def benchBucketedBatcher(numTexts: int = 20000, maxWords: int = 400,
+                         batchSize: int = 64, budgets=(1024, 4096, 16384)):
+
+    tokenizer = T.Tokenizer()
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    texts = makeTexts(numTexts, maxWords)
+
+    def encodeFixed():
+        return [tokenizer.encode(texts[i:i + batchSize], padding=True)
+                for i in range(0, len(texts), batchSize)]
+
+    seconds = bestOf(encodeFixed, repeat=1)
+    batches = encodeFixed()
+    real = sum(len(tokenizer.encode_fast(text)) for text in texts)
+    padded = sum(len(batch) * len(batch[0]) for batch in batches)
+    print(f'{numTexts} texts of 1 to {maxWords} words')
+    print(f'  encode, batches of {batchSize:5d}:   {seconds:6.2f}s  '
+          f'{padded:11,d} ids  efficiency {real / padded:5.1%}')
+
+    for maxTokens in budgets:
+        batcher = B.BucketedBatcher(tokenizer, maxTokens=maxTokens)
+        seconds = bestOf(lambda: batcher.batch(texts), repeat=1)
+        stats = batcher.stats()
+        print(f'  BucketedBatcher, {maxTokens:6d} tokens: {seconds:6.2f}s  '
+              f'{stats["padded_tokens"]:11,d} ids  efficiency {stats["efficiency"]:5.1%}  '
+              f'({stats["batches"]} batches)')
+
+
+if __name__ == '__main__':
+    benchBucketedBatcher()
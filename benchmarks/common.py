@@ -0,0 +1,78 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import random
+import time
+
+# Words drawn by the synthetic corpora, a mix of in-vocab words for
+# tests/TestVocab.txt, unknown words, punctuation and special tokens.
+WORDS = ['is', 'the', 'man', 'who', 'tall', 'happy', 'Is', 'The', 'cat',
+         'eats', 'food', 'quite', 'though', 'also', '?', ',', '.', '!',
+         'tall?', 'man,', '<unk>', '</s>', '<s>']
+
+
+def makeText(numWords: int, seed: int = 0) -> str:
+    """
+    Returns a reproducible synthetic text of numWords words,
+    with a newline roughly every 20 words.
+    """
+    rng = random.Random(seed)
+    words = rng.choices(WORDS, k=numWords)
+    for i in range(19, numWords, 20):
+        words[i] += '\n'
+    return ' '.join(words)
+
+
+def makeTexts(numTexts: int, maxWords: int, seed: int = 0):
+    """
+    Returns a reproducible list of numTexts synthetic texts with
+    between 1 and maxWords words each.
+    """
+    rng = random.Random(seed)
+    return [makeText(rng.randint(1, maxWords), seed + i)
+            for i in range(numTexts)]
+
+
+def bestOf(fn, repeat: int = 3) -> float:
+    """
+    Returns the best wall-clock time in seconds of repeat calls to fn.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def makeCorpus(fname: str, megabytes: float, seed: int = 0,
+               lexiconSize: int = 50000):
+    """
+    Writes a reproducible synthetic corpus of about megabytes MB to
+    fname: lines of 5 to 25 words drawn with Zipfian frequencies from a
+    lexicon of random lowercase and capitalised words and punctuation,
+    with the odd special token.
+    """
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    lexicon = [''.join(rng.choices(letters, k=rng.randint(2, 10)))
+               for _ in range(lexiconSize)]
+    lexicon[:12] = ['the', ',', '.', 'of', 'and', 'to', 'a', 'in', 'is', '?',
+                    'The', '<unk>']
+    cumWeights = []
+    total = 0.0
+    for rank in range(lexiconSize):
+        total += 1 / (rank + 1)
+        cumWeights.append(total)
+
+    size = int(megabytes * 1024 * 1024)
+    with open(fname, 'w') as f:
+        written = 0
+        while written < size:
+            lines = []
+            for _ in range(1000):
+                words = rng.choices(lexicon, cum_weights=cumWeights,
+                                    k=rng.randint(5, 25))
+                lines.append(' '.join(words) + '\n')
+            block = ''.join(lines)
+            f.write(block)
+            written += len(block)
@@ -0,0 +1,28 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+from benchmarks.common import WORDS, makeTexts, bestOf
+
+
+def benchCountTokens(numTexts: int = 2000, maxWords: int = 400):
+
+    tokenizer = T.Tokenizer()
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    mixed = makeTexts(numTexts, maxWords)
+    # Without special tokens (and <, /, >) nothing is ever glued
+    plain = [' '.join(word for word in text.split(' ') if word.strip() not in WORDS[-3:])
+             for text in mixed]
+
+    for name, texts in (('with special tokens', mixed), ('plain words', plain)):
+        numIds = sum(tokenizer.count_tokens(texts))
+        print(f'{numTexts} texts, {numIds} ids, {name}')
+        for label, fn in (('len(encode(text))', lambda: [len(tokenizer.encode(text)) for text in texts]),
+                          ('count_tokens(text)', lambda: [tokenizer.count_tokens(text) for text in texts]),
+                          ('count_tokens_batch', lambda: tokenizer.count_tokens_batch(texts)),
+                          ('  return_unk=True', lambda: tokenizer.count_tokens_batch(texts, return_unk=True))):
+            seconds = bestOf(fn)
+            print(f'  {label:20s} {1000 * seconds:8.2f} ms  {numIds / seconds:12,.0f} ids/s')
+
+
+if __name__ == '__main__':
+    benchCountTokens()
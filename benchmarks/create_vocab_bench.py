@@ -0,0 +1,84 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import tempfile
+from benchmarks.common import makeCorpus, makeText, bestOf
+
+
+def benchCreateVocab(megabytes: int = 20, workers=(1, 4, 16)):
+
+    text = makeText(50000)
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        with open(fname, 'w') as f:
+            while f.tell() < megabytes * 1024 * 1024:
+                f.write(text)
+
+        print(f'create_vocab on a {megabytes} MB corpus '
+              f'({os.cpu_count()} CPUs available)')
+        serial = None
+        for n in workers:
+            tokenizer = T.Tokenizer()
+            seconds = bestOf(lambda: tokenizer.create_vocab(fname, freqThreshold=1,
+                                                            workers=n), repeat=1)
+            serial = serial or seconds
+            print(f'  {n:2d} workers: {seconds:6.2f}s  '
+                  f'{megabytes / seconds:6.1f} MB/s  speedup {serial / seconds:5.2f}x')
+
+
+def benchUpdateVocab(megabytes: int = 20, shards: int = 10):
+
+    with tempfile.TemporaryDirectory() as tmp:
+        names = []
+        for shard in range(shards):
+            fname = os.path.join(tmp, f'shard{shard}.txt')
+            makeCorpus(fname, megabytes / shards, seed=shard)
+            names.append(fname)
+        full = os.path.join(tmp, 'full.txt')
+        with open(full, 'w') as out:
+            for fname in names:
+                with open(fname) as f:
+                    out.write(f.read())
+
+        tokenizer = T.Tokenizer()
+        rebuild = bestOf(lambda: tokenizer.create_vocab(full, freqThreshold=1), repeat=1)
+        print(f'create_vocab on all {shards} shards ({megabytes} MB): {rebuild:6.2f}s')
+
+        tokenizer.create_vocab(names[0], freqThreshold=1)
+        for fname in names[1:-1]:
+            tokenizer.update_vocab(fname)
+        vocab = os.path.join(tmp, 'vocab.txt')
+        tokenizer.save_tokenizer(vocab)
+        loaded = T.Tokenizer()
+        load = bestOf(lambda: loaded.load_tokenizer(vocab), repeat=1)
+        update = bestOf(lambda: loaded.update_vocab(names[-1]), repeat=1)
+        print(f'update_vocab with the newest shard:      {update:6.2f}s '
+              f'(+ {load:.2f}s to load the vocabulary and counts)')
+
+
+def benchThresholdSweep(megabytes: int = 20, thresholds=(0, 1, 2, 5, 10, 30, 100, 300)):
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        makeCorpus(fname, megabytes)
+
+        tokenizer = T.Tokenizer()
+        rebuild = bestOf(lambda: [tokenizer.create_vocab(fname, freqThreshold=threshold)
+                                  for threshold in thresholds], repeat=1)
+        print(f'create_vocab once per threshold ({len(thresholds)} thresholds, '
+              f'{megabytes} MB): {rebuild:6.2f}s')
+
+        count = bestOf(lambda: tokenizer.count_vocab(fname), repeat=1)
+        sweep = bestOf(lambda: tokenizer.threshold_sweep(range(1000)))
+        build = bestOf(lambda: tokenizer.build_vocab(thresholds[-1]))
+        print(f'count_vocab once: {count:6.2f}s, threshold_sweep of 1000 thresholds: '
+              f'{1000 * sweep:.1f} ms, build_vocab: {1000 * build:.1f} ms')
+        for row in tokenizer.threshold_sweep(thresholds):
+            print(f'  freqThreshold {row["freqThreshold"]:4d}: {row["vocab_size"]:7d} tokens  '
+                  f'coverage {row["coverage"]:7.2%}  oov {row["oov_rate"]:7.2%}')
+
+
+if __name__ == '__main__':
+    benchCreateVocab()
+    benchUpdateVocab()
+    benchThresholdSweep()
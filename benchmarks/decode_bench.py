@@ -0,0 +1,88 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import vocab as V
+import random
+import tracemalloc
+from benchmarks.common import bestOf, makeTexts
+
+
+def tracedSize(build) -> int:
+    """
+    Returns the bytes still allocated by build() once it returns,
+    i.e., the size of the object it builds.
+    """
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del obj
+    return size
+
+
+def benchDecode(vocabSize: int = 500000, batchSize: int = 64, seqLength: int = 512):
+
+    print(f'idx2word memory with {vocabSize} tokens')
+    listSize = tracedSize(lambda: [f'word{i}' for i in range(vocabSize)])
+    tokens = [f'word{i}' for i in range(vocabSize)]
+    packedSize = tracedSize(lambda: V.PackedIdx2Word.from_tokens(tokens))
+    print(f'  list   {listSize / 1e6:7.1f} MB  {listSize / vocabSize:5.1f} bytes/token')
+    print(f'  packed {packedSize / 1e6:7.1f} MB  {packedSize / vocabSize:5.1f} bytes/token')
+
+    # Zipf-like ids, so a small cache of hot tokens is worth having
+    rng = random.Random(0)
+    weights = [1 / (rank + 1) for rank in range(vocabSize)]
+    flat = rng.choices(range(vocabSize), weights=weights, k=batchSize * seqLength)
+    ids = [flat[i:i + seqLength] for i in range(0, len(flat), seqLength)]
+
+    tokenizer = T.Tokenizer()
+    tokenizer.idx2word = tokens
+    print(f'decode of a {batchSize}x{seqLength} batch')
+    for name, cacheSize in (('list', None), ('packed', 0), ('packed+lru', 1024)):
+        if cacheSize is not None:
+            tokenizer.idx2word = V.PackedIdx2Word.from_tokens(tokens, cacheSize)
+        seconds = bestOf(lambda: tokenizer.decode(ids))
+        print(f'  {name:10s} {len(flat) / seconds:12,.0f} tokens/s')
+
+
+def naiveDecodeToText(tokenizer, row):
+    """
+    Detokenization as done on top of decode before decode_to_text:
+    one token at a time, deciding the spacing of each in Python.
+    """
+    special = (tokenizer.pad_token, tokenizer.bos_token, tokenizer.eos_token)
+    text = ''
+    for token in tokenizer.decode(row):
+        if token in special:
+            continue
+        if text and token not in '.,!?;:%)]}\'/-' and text[-1] not in '([{$\'/-':
+            text += ' '
+        text += token
+    return text
+
+
+def benchDecodeToText(numTexts: int = 2000, maxWords: int = 400):
+
+    tokenizer = T.Tokenizer(lower=False)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    texts = makeTexts(numTexts, maxWords)
+    for text in texts:
+        for token in tokenizer.word_tokenize(text):
+            if token not in tokenizer.word2idx:
+                tokenizer.word2idx[token] = len(tokenizer.idx2word)
+                tokenizer.idx2word.append(token)
+    batch = tokenizer.encode(texts, add_special_tokens=True, padding=True)
+    numIds = sum(map(len, batch))
+
+    assert [naiveDecodeToText(tokenizer, row) for row in batch] == \
+        tokenizer.decode_to_text(batch)
+    print(f'decode_to_text of a {len(batch)}x{len(batch[0])} padded batch')
+    seconds = bestOf(lambda: [naiveDecodeToText(tokenizer, row) for row in batch])
+    print(f'  per token in Python {numIds / seconds:12,.0f} ids/s')
+    seconds = bestOf(lambda: tokenizer.decode_to_text(batch))
+    print(f'  decode_to_text      {numIds / seconds:12,.0f} ids/s')
+
+
+if __name__ == '__main__':
+    benchDecode()
+    benchDecodeToText()
@@ -0,0 +1,33 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+from benchmarks.common import makeTexts, bestOf
+
+
+def benchDedup(numTexts: int = 2000, maxWords: int = 300):
+
+    tokenizer = T.Tokenizer()
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    cached = T.Tokenizer(textCacheSize=4096)
+    cached.load_tokenizer('./tests/TestVocab.txt')
+    rng = random.Random(0)
+
+    print(f'encode_batch of {numTexts} texts, by fraction of repeated texts')
+    for fraction in (0.0, 0.5, 0.9):
+        distinct = makeTexts(max(int(numTexts * (1 - fraction)), 1), maxWords)
+        texts = distinct + rng.choices(distinct, k=numTexts - len(distinct))
+        rng.shuffle(texts)
+
+        naive = bestOf(lambda: [tokenizer.encode_fast(text) for text in texts])
+        batch = bestOf(lambda: tokenizer.encode_batch(texts))
+        ratio = 1 - len(set(texts)) / len(texts)
+        cached.encode_batch(texts)
+        warm = bestOf(lambda: cached.encode_batch(texts))
+        print(f'  dedup ratio {ratio:4.2f}: per text {1000 * naive:7.1f} ms  '
+              f'encode_batch {1000 * batch:7.1f} ms  '
+              f'with warm textCache {1000 * warm:7.1f} ms')
+
+
+if __name__ == '__main__':
+    benchDedup()
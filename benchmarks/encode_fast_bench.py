@@ -0,0 +1,55 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import tracemalloc
+from benchmarks.common import makeText, bestOf
+
+
+def peakMemory(fn) -> int:
+    """
+    Returns the peak memory in bytes traced while running fn.
+    """
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def referenceEncode(tokenizer: T.Tokenizer, text: str):
+    """
+    The original encode of a single text: preprocess, split, then
+    convert_tokens_to_ids one word at a time (as in
+    tests/encode_fast_test.py). encode itself now runs encode_fast.
+    """
+    toRet = []
+    for word in tokenizer.preprocess(text).split():
+        tokenizedID = tokenizer.convert_tokens_to_ids(word)
+        if (type(tokenizedID) == list):
+            toRet.extend(tokenizedID)
+        else:
+            toRet.append(tokenizedID)
+    return toRet
+
+
+def benchEncodeFast(numWords: int = 200000):
+
+    tokenizer = T.Tokenizer()
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    text = makeText(numWords)
+    numTokens = len(tokenizer.encode_fast(text))
+
+    assert referenceEncode(tokenizer, text) == tokenizer.encode_fast(text)
+
+    print(f'reference encode vs encode_fast on {numTokens} tokens')
+    for name, fn in (('reference', lambda: referenceEncode(tokenizer, text)),
+                     ('encode_fast', lambda: tokenizer.encode_fast(text)),
+                     ('iter_ids', lambda: sum(1 for _ in tokenizer.iter_ids(text)))):
+        seconds = bestOf(fn)
+        peak = peakMemory(fn)
+        print(f'  {name:12s} {numTokens / seconds:12,.0f} tokens/s  '
+              f'{peak / numTokens:7.1f} peak bytes/token')
+
+
+if __name__ == '__main__':
+    benchEncodeFast()
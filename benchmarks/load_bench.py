@@ -0,0 +1,36 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import tempfile
+from benchmarks.common import bestOf
+
+
+def benchLoadTokenizer(vocabSize: int = 500000):
+
+    tokenizer = T.Tokenizer()
+    tokenizer.idx2word = [f'word{i}' for i in range(vocabSize)] + ['<unk>']
+    tokenizer.word2idx = {word: i for i, word in enumerate(tokenizer.idx2word)}
+    probe = [f'word{i}' for i in range(0, vocabSize, vocabSize // 1000)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f'load_tokenizer with {vocabSize} tokens')
+        for binary in (False, True):
+            fname = os.path.join(tmp, 'vocab.bin' if binary else 'vocab.txt')
+            tokenizer.save_tokenizer(fname, binary=binary)
+
+            def load():
+                loaded = T.Tokenizer()
+                loaded.load_tokenizer(fname)
+                return loaded
+
+            seconds = bestOf(load)
+            loaded = load()
+            lookups = bestOf(lambda: loaded.convert_tokens_to_ids(probe))
+            print(f'  {"binary" if binary else "text":6s} '
+                  f'{os.path.getsize(fname) / 1e6:6.1f} MB  '
+                  f'startup {seconds * 1000:8.2f} ms  '
+                  f'{len(probe) / lookups:12,.0f} lookups/s')
+
+
+if __name__ == '__main__':
+    benchLoadTokenizer()
@@ -0,0 +1,74 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+import tempfile
+from benchmarks.common import bestOf
+
+
+def originalConvertTokens(tokenizer, tokens):
+    """
+    convert_tokens_to_ids as it was before the frozen lookup, kept here
+    to compare against: unk and keys() resolved on every call.
+    """
+    unknown = tokenizer.word2idx['<unk>']
+    keys = tokenizer.word2idx.keys()
+    tokenIDs = []
+    if (type(tokens) == str):
+        if (tokens in keys):
+            return [tokenizer.word2idx[tokens]]
+        else:
+            return unknown
+    else:
+        for token in tokens:
+            if (token in keys):
+                tokenIDs.append(tokenizer.word2idx[token])
+            else:
+                tokenIDs.append(unknown)
+    return tokenIDs
+
+
+def benchLookup(vocabSize: int = 50000, batchSize: int = 64, seqLength: int = 512):
+
+    rng = random.Random(0)
+    tokens = [f'word{i}' for i in range(vocabSize)] + ['<unk>', '<pad>', '<s>', '</s>']
+    # Zipf-like tokens with about 5% out of vocabulary
+    weights = [1 / (rank + 1) for rank in range(vocabSize)]
+    flat = rng.choices(tokens[:vocabSize], weights=weights, k=batchSize * seqLength)
+    for i in rng.sample(range(len(flat)), len(flat) // 20):
+        flat[i] = f'oov{i}'
+    batch = [flat[i:i + seqLength] for i in range(0, len(flat), seqLength)]
+    numTokens = len(flat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'vocab.bin')
+        tokenizer = T.Tokenizer()
+        tokenizer.idx2word = tokens
+        tokenizer.word2idx = {token: idx for idx, token in enumerate(tokens)}
+        tokenizer.save_tokenizer(fname, binary=True)
+        binary = T.Tokenizer()
+        binary.load_tokenizer(fname)
+
+        print(f'token lookups on a {batchSize}x{seqLength} batch, {vocabSize} token vocabulary')
+        for name, tok in (('dict', tokenizer), ('binary', binary)):
+            cases = {'original, per token': lambda: [originalConvertTokens(tok, token)
+                                                     for tokens in batch for token in tokens],
+                     'original, per list': lambda: [originalConvertTokens(tok, tokens)
+                                                    for tokens in batch],
+                     'convert_tokens_to_ids, per token': lambda: [tok.convert_tokens_to_ids(token)
+                                                                  for tokens in batch
+                                                                  for token in tokens],
+                     'convert_tokens_to_ids, per list': lambda: [tok.convert_tokens_to_ids(tokens)
+                                                                 for tokens in batch],
+                     'convert_tokens_to_ids_batch': lambda: tok.convert_tokens_to_ids_batch(batch)}
+            for case, fn in cases.items():
+                seconds = bestOf(fn)
+                print(f'  {name:6s} {case:34s} {numTokens / seconds:14,.0f} lookups/s')
+
+            seconds = bestOf(lambda: [(tok.bos_token_id, tok.eos_token_id, tok.pad_token_id)
+                                      for _ in range(10000)])
+            print(f'  {name:6s} {"special token ids":34s} {30000 / seconds:14,.0f} lookups/s')
+
+
+if __name__ == '__main__':
+    benchLookup()
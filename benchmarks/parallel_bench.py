@@ -0,0 +1,29 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import parallel as P
+from benchmarks.common import makeTexts, bestOf
+
+
+def benchParallelEncoder(numTexts: int = 20000, maxWords: int = 200):
+
+    tokenizer = T.Tokenizer()
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    texts = makeTexts(numTexts, maxWords)
+
+    serial = bestOf(lambda: tokenizer.encode(texts), repeat=1)
+    print(f'serial encode on {numTexts} texts: {serial:.2f}s')
+
+    cpus = os.cpu_count() or 1
+    processes = [n for n in (1, 2, 4, 8, 16, 32) if n <= cpus] or [1]
+    for n in processes:
+        with P.ParallelEncoder(tokenizer, processes=n) as encoder:
+            encoder.encode(texts[:n])  # start the workers outside the timing
+            seconds = bestOf(lambda: encoder.encode(texts), repeat=1)
+        print(f'  {n:2d} processes: {seconds:6.2f}s  '
+              f'speedup {serial / seconds:5.2f}x  '
+              f'efficiency {serial / seconds / n:5.0%}')
+
+
+if __name__ == '__main__':
+    benchParallelEncoder()
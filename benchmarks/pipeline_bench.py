@@ -0,0 +1,57 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import pipeline as P
+import tempfile
+import time
+from itertools import islice
+from benchmarks.common import makeCorpus
+
+# A stand-in training loop: each step takes the next batch and then
+# "runs the model" for a fixed time, sleeping (as a GPU step releases
+# the GIL). Encoding on the main thread adds to every step; the
+# pipeline encodes the next batches while the model runs.
+
+
+def benchDataPipeline(megabytes: float = 2, batchSize: int = 64,
+                      stepSeconds: float = 0.005):
+
+    tokenizer = T.Tokenizer(maxSequenceLength=256)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        makeCorpus(fname, megabytes)
+
+        start = time.perf_counter()
+        steps = 0
+        with open(fname) as f:
+            while True:
+                texts = list(islice(f, batchSize))
+                if not texts:
+                    break
+                tokenizer.encode(texts, add_special_tokens=True, padding=True, truncate=True)
+                time.sleep(stepSeconds)
+                steps += 1
+        inline = time.perf_counter() - start
+        print(f'{steps} steps of {1000 * stepSeconds:.0f} ms on {megabytes} MB '
+              f'({os.cpu_count()} CPUs available)')
+        print(f'  encode in the loop:         {inline:6.2f}s')
+
+        for processes in (0, os.cpu_count() or 1):
+            with P.DataPipeline(tokenizer, fname, batchSize=batchSize, prefetch=8,
+                                shuffleBuffer=10000, seed=0, processes=processes,
+                                add_special_tokens=True, truncate=True) as pipeline:
+                start = time.perf_counter()
+                for batch in pipeline:
+                    time.sleep(stepSeconds)
+                seconds = time.perf_counter() - start
+                stats = pipeline.stats()
+            workers = f'{processes} processes' if processes else '1 thread'
+            print(f'  DataPipeline, {workers:11s}  {seconds:6.2f}s  '
+                  f'stalls {stats["stalls"]:4d} ({stats["stall_seconds"]:5.2f}s)  '
+                  f'mean queue depth {stats["queue_depth"]["mean"]:4.1f}  '
+                  f'backpressure {stats["backpressure_seconds"]:5.2f}s')
+
+
+if __name__ == '__main__':
+    benchDataPipeline()
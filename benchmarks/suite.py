@@ -0,0 +1,221 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import json
+import multiprocessing
+import resource
+import tempfile
+import time
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.common import makeCorpus
+
+# Each stage runs in a fresh process, so that its peak RSS is its own.
+# A stage gets the corpus and vocabulary file names and returns the
+# seconds it took and how many units (tokens, or vocabulary entries
+# for loading) it processed in that time. Stages stream the corpus in
+# batches of BATCH_SIZE lines, preparing their input one batch at a
+# time outside the timer, so neither the time nor the peak RSS grows
+# with the corpus held in memory.
+
+BATCH_SIZE = 64
+
+
+def readBatches(corpus: str):
+    """
+    Yields the lines of corpus in lists of BATCH_SIZE lines.
+    """
+    with open(corpus) as f:
+        while True:
+            batch = list(islice(f, BATCH_SIZE))
+            if not batch:
+                return
+            yield batch
+
+
+def timeBatches(corpus: str, run, prepare=None):
+    """
+    Calls run on each batch of lines of corpus (after prepare, if
+    given, which is not timed). Returns the seconds spent in run and
+    the sum of what it returned.
+    """
+    seconds = 0.0
+    count = 0
+    for batch in readBatches(corpus):
+        items = prepare(batch) if prepare is not None else batch
+        start = time.perf_counter()
+        count += run(items)
+        seconds += time.perf_counter() - start
+    return seconds, count
+
+
+def loadTokenizer(vocab: str) -> T.Tokenizer:
+    tokenizer = T.Tokenizer(maxSequenceLength=128)
+    tokenizer.load_tokenizer(vocab)
+    return tokenizer
+
+
+def stageCreateVocab(corpus, vocab):
+    tokenizer = T.Tokenizer()
+    start = time.perf_counter()
+    tokenizer.create_vocab(corpus, freqThreshold=1)
+    seconds = time.perf_counter() - start
+    tokenizer.save_tokenizer(vocab)
+    tokenizer.save_tokenizer(vocab + '.bin', binary=True)
+    return seconds, sum(tokenizer.counts.values()), 'tokens'
+
+
+def stageLoadText(corpus, vocab):
+    start = time.perf_counter()
+    tokenizer = loadTokenizer(vocab)
+    return time.perf_counter() - start, len(tokenizer), 'entries'
+
+
+def stageLoadBinary(corpus, vocab):
+    start = time.perf_counter()
+    tokenizer = loadTokenizer(vocab + '.bin')
+    return time.perf_counter() - start, len(tokenizer), 'entries'
+
+
+def stagePreprocess(corpus, vocab):
+    tokenizer = loadTokenizer(vocab)
+    seconds, count = timeBatches(
+        corpus, lambda lines: sum(len(tokenizer.preprocess(line).split(' ')) for line in lines))
+    return seconds, count, 'tokens'
+
+
+def stageWordTokenize(corpus, vocab):
+    tokenizer = loadTokenizer(vocab)
+    seconds, count = timeBatches(
+        corpus, lambda lines: sum(len(tokenizer.word_tokenize(line)) for line in lines))
+    return seconds, count, 'tokens'
+
+
+def stageConvertTokens(corpus, vocab):
+    tokenizer = loadTokenizer(vocab)
+    seconds, count = timeBatches(
+        corpus, lambda tokens: sum(len(tokenizer.convert_tokens_to_ids(line)) for line in tokens),
+        prepare=lambda lines: [tokenizer.word_tokenize(line) for line in lines])
+    return seconds, count, 'tokens'
+
+
+def stageEncode(corpus, vocab):
+    tokenizer = loadTokenizer(vocab)
+    seconds, count = timeBatches(
+        corpus, lambda lines: sum(len(tokenizer.encode(line)) for line in lines))
+    return seconds, count, 'tokens'
+
+
+def stageEncodeBatch(corpus, vocab):
+    tokenizer = loadTokenizer(vocab)
+    seconds, count = timeBatches(
+        corpus, lambda lines: sum(len(row) for row in tokenizer.encode(
+            lines, add_special_tokens=True, padding=True, truncate=True)))
+    return seconds, count, 'tokens'
+
+
+def stageDecode(corpus, vocab):
+    tokenizer = loadTokenizer(vocab)
+    seconds, count = timeBatches(
+        corpus, lambda ids: sum(len(row) for row in tokenizer.decode(ids)),
+        prepare=lambda lines: [tokenizer.encode(line) for line in lines])
+    return seconds, count, 'tokens'
+
+
+# create_vocab must run first, as it writes the vocabulary the others load
+STAGES = {'create_vocab': stageCreateVocab,
+          'load_tokenizer': stageLoadText,
+          'load_tokenizer_binary': stageLoadBinary,
+          'preprocess': stagePreprocess,
+          'word_tokenize': stageWordTokenize,
+          'convert_tokens_to_ids': stageConvertTokens,
+          'encode': stageEncode,
+          'encode_batch': stageEncodeBatch,
+          'decode': stageDecode}
+
+
+def runStage(name: str, corpus: str, vocab: str):
+    seconds, count, unit = STAGES[name](corpus, vocab)
+    peakKB = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'seconds': seconds,
+            'throughput': count / seconds if seconds else float('inf'),
+            'unit': unit + '/s',
+            'peak_rss_mb': peakKB / 1024}
+
+
+def corpusPath(megabytes: float, seed: int, dataDir: str = None) -> str:
+    """
+    Returns the path of the synthetic corpus of the given size and
+    seed, generating it the first time it is asked for.
+    """
+    dataDir = dataDir or os.path.join(tempfile.gettempdir(), 'tokenizer-bench')
+    os.makedirs(dataDir, exist_ok=True)
+    fname = os.path.join(dataDir, f'corpus-{megabytes:g}mb-seed{seed}.txt')
+    if not os.path.exists(fname):
+        makeCorpus(fname + '.tmp', megabytes, seed)
+        os.replace(fname + '.tmp', fname)
+    return fname
+
+
+def runSuite(sizes=(1,), seed: int = 0, dataDir: str = None):
+    """
+    Runs every stage on a synthetic corpus of each size (in MB) and
+    returns the results as {'<size>MB': {stage: result}}.
+    """
+    results = {}
+    context = multiprocessing.get_context('fork')
+    for megabytes in sizes:
+        corpus = corpusPath(megabytes, seed, dataDir)
+        key = f'{megabytes:g}MB'
+        results[key] = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            vocab = os.path.join(tmp, 'vocab.txt')
+            for name in STAGES:
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    result = pool.submit(runStage, name, corpus, vocab).result()
+                results[key][name] = result
+                print(f'  {key:>7s} {name:22s} {result["throughput"]:14,.0f} '
+                      f'{result["unit"]:10s} {result["peak_rss_mb"]:8.1f} MB peak RSS')
+    return results
+
+
+def compareToBaseline(results, baseline, tolerance: float = 0.2):
+    """
+    Returns a description of each stage whose throughput dropped more
+    than tolerance (a fraction) below the baseline.
+    """
+    regressions = []
+    for size, stages in results.items():
+        for name, result in stages.items():
+            if name not in baseline.get(size, {}):
+                continue
+            expected = baseline[size][name]['throughput']
+            if result['throughput'] < expected * (1 - tolerance):
+                regressions.append(f'{size} {name}: {result["throughput"]:,.0f} '
+                                   f'vs baseline {expected:,.0f} {result["unit"]}')
+    return regressions
+
+
+def benchSuite(sizes=(1,), seed: int = 0, baseline: str = None,
+               saveBaseline: str = None, tolerance: float = 0.2,
+               dataDir: str = None) -> bool:
+    """
+    Runs the suite, optionally saves the results as a baseline JSON
+    and compares them to a saved one. Returns False on a regression.
+    """
+    results = runSuite(sizes, seed, dataDir)
+    if saveBaseline:
+        with open(saveBaseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'Saved baseline to {saveBaseline}')
+    if baseline:
+        with open(baseline) as f:
+            regressions = compareToBaseline(results, json.load(f), tolerance)
+        for regression in regressions:
+            print(f'  REGRESSION {regression}')
+        return not regressions
+    return True
+
+
+if __name__ == '__main__':
+    benchSuite()
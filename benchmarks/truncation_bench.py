@@ -0,0 +1,26 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+from benchmarks.common import makeText, bestOf
+
+
+def benchTruncation(sizes=(10, 100, 500, 5000), maxSequenceLength: int = 512):
+
+    print(f'encode(truncate=True) to {maxSequenceLength} ids by document size')
+    for kilobytes in sizes:
+        text = makeText(kilobytes * 1024 // 4)[:kilobytes * 1024]
+        timings = []
+        for truncation in T.TRUNCATION_STRATEGIES:
+            tokenizer = T.Tokenizer(maxSequenceLength=maxSequenceLength,
+                                    truncation=truncation)
+            tokenizer.load_tokenizer('./tests/TestVocab.txt')
+            seconds = bestOf(lambda: tokenizer.encode(text, add_special_tokens=True,
+                                                      truncate=True))
+            timings.append(f'{truncation} {1000 * seconds:7.3f} ms')
+        full = bestOf(lambda: tokenizer.encode(text, add_special_tokens=True), repeat=1)
+        print(f'  {kilobytes:5d} KB: ' + '  '.join(timings) +
+              f'  (untruncated {1000 * full:8.1f} ms)')
+
+
+if __name__ == '__main__':
+    benchTruncation()
@@ -0,0 +1,168 @@
+import heapq
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Prefix marking a subword that continues a word (WordPiece style),
+# e.g., "playing" may be split into ["play", "##ing"].
+CONTINUATION = '##'
+
+
+def _merge_pair(first: str, second: str) -> str:
+    return first + second[len(CONTINUATION):]
+
+
+def word_symbols(word: str) -> List[str]:
+    """
+    Returns the initial symbols of word: its first character, then
+    each following character with the continuation prefix.
+    """
+    return [word[0]] + [CONTINUATION + char for char in word[1:]]
+
+
+def train_bpe(wordCounts: Dict[str, int], numMerges: int,
+              minFrequency: int = 2) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Learns up to numMerges byte-pair-encoding merges from word counts.
+    Pair counts are kept incrementally: merging a pair only recounts the
+    words that contain it, and the most frequent pair is taken from a
+    heap whose stale entries are skipped when popped.
+
+    Args:
+        wordCounts (dict): Number of occurrences of each word.
+        numMerges (int): Maximum number of merges to learn.
+        minFrequency (int): Stop once the most frequent pair occurs
+                            fewer times than this. Default is 2.
+
+    Returns:
+        Tuple[List[str], List[Tuple[str, str]]]: The initial symbols, most
+            frequent first, and the merges in the order they were learned.
+    """
+    words = [word_symbols(word) for word in wordCounts]
+    counts = list(wordCounts.values())
+
+    symbolCounts = Counter()
+    pairCounts = Counter()
+    pairWords = {}
+    for idx, (symbols, count) in enumerate(zip(words, counts)):
+        for symbol in symbols:
+            symbolCounts[symbol] += count
+        for pair in zip(symbols, symbols[1:]):
+            pairCounts[pair] += count
+            pairWords.setdefault(pair, set()).add(idx)
+    symbols = sorted(symbolCounts, key=lambda s: (-symbolCounts[s], s))
+
+    heap = [(-count, pair) for pair, count in pairCounts.items()]
+    heapq.heapify(heap)
+
+    merges = []
+    while heap and len(merges) < numMerges:
+        negCount, pair = heapq.heappop(heap)
+        if pairCounts.get(pair, 0) != -negCount:
+            continue
+        if -negCount < minFrequency:
+            break
+        merges.append(pair)
+        merged = _merge_pair(*pair)
+
+        changed = set()
+        for idx in sorted(pairWords.pop(pair)):
+            old = words[idx]
+            count = counts[idx]
+            new = []
+            i = 0
+            while i < len(old):
+                if i + 1 < len(old) and (old[i], old[i + 1]) == pair:
+                    new.append(merged)
+                    i += 2
+                else:
+                    new.append(old[i])
+                    i += 1
+            for oldPair in zip(old, old[1:]):
+                pairCounts[oldPair] -= count
+                changed.add(oldPair)
+            for newPair in zip(new, new[1:]):
+                pairCounts[newPair] += count
+                pairWords.setdefault(newPair, set()).add(idx)
+                changed.add(newPair)
+            words[idx] = new
+
+        for changedPair in changed:
+            count = pairCounts[changedPair]
+            if count <= 0:
+                del pairCounts[changedPair]
+                pairWords.pop(changedPair, None)
+            elif changedPair != pair:
+                heapq.heappush(heap, (-count, changedPair))
+        pairCounts.pop(pair, None)
+
+    return symbols, merges
+
+
+class BPE:
+    """
+    Splits words into subwords by applying learned merges in the order
+    they were learned. Segmentations are cached per word (up to
+    cacheSize words), since the same words recur constantly.
+
+    Attributes:
+        merges (List[Tuple[str, str]]): The merges, in order.
+        cacheSize (int): Maximum number of cached words. Default is 65536.
+    """
+
+    def __init__(self, merges: List[Tuple[str, str]], cacheSize: int = 65536):
+        self.merges = list(merges)
+        self.ranks = {pair: rank for rank, pair in enumerate(self.merges)}
+        self.cacheSize = cacheSize
+        self._cache = {}
+
+    def segment(self, word: str) -> List[str]:
+        """
+        Returns the subwords of word.
+
+        For example,
+            >>> BPE([('l', '##o'), ('lo', '##w')]).segment('lower')
+            >>> ['low', '##e', '##r']
+        """
+        pieces = self._cache.get(word)
+        if pieces is not None:
+            return pieces
+
+        pieces = word_symbols(word) if word else []
+        ranks = self.ranks
+        while len(pieces) > 1:
+            best = min(zip(pieces, pieces[1:]),
+                       key=lambda pair: ranks.get(pair, len(ranks)))
+            if best not in ranks:
+                break
+            merged = _merge_pair(*best)
+            new = []
+            i = 0
+            while i < len(pieces):
+                if i + 1 < len(pieces) and (pieces[i], pieces[i + 1]) == best:
+                    new.append(merged)
+                    i += 2
+                else:
+                    new.append(pieces[i])
+                    i += 1
+            pieces = new
+
+        if len(self._cache) >= self.cacheSize:
+            self._cache.clear()
+        self._cache[word] = pieces
+        return pieces
+
+    def save(self, fname: str):
+        """
+        Writes the merges to fname, one "first second" pair per line.
+        """
+        with open(fname, 'w') as f:
+            for first, second in self.merges:
+                f.write(f'{first} {second}\n')
+
+    @classmethod
+    def load(cls, fname: str):
+        """
+        Reads merges written by save.
+        """
+        with open(fname) as f:
+            return cls([tuple(line.split()) for line in f if line.strip()])
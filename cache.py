@@ -0,0 +1,70 @@
+from collections import OrderedDict
+from typing import Dict
+
+
+class LRUCache:
+    """
+    A size-bounded least recently used cache with hit and miss counters.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept.
+        hits (int): Number of get calls that found their key.
+        misses (int): Number of get calls that did not.
+        owner: Whatever the cached values were computed from (e.g., a
+               vocabulary). Users of the cache can compare it against
+               their current state and clear the cache when it differs.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize < 1:
+            raise ValueError('maxsize must be at least 1')
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.owner = None
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def get(self, key, default=None):
+        """
+        Returns the value for key (marking it most recently used),
+        or default if key is not cached.
+        """
+        data = self._data
+        try:
+            value = data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Caches value for key, evicting the least recently used entry
+        if the cache is full.
+        """
+        data = self._data
+        data[key] = value
+        data.move_to_end(key)
+        if len(data) > self.maxsize:
+            data.popitem(last=False)
+
+    def clear(self):
+        """
+        Drops every entry (the counters are kept).
+        """
+        self._data.clear()
+
+    def info(self) -> Dict[str, int]:
+        """
+        Returns the counters and size of the cache as a dict.
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'size': len(self._data), 'maxsize': self.maxsize}
@@ -0,0 +1,182 @@
+import mmap
+import os
+import struct
+from array import array
+from typing import Iterable, Iterator
+
+# Encoded corpus layout (native byte order), all sections contiguous:
+#   header   MAGIC, version, id typecode ('H' for uint16 or 'I' for
+#            uint32), whether special tokens were added, the vocabulary
+#            fingerprint, the size and mtime of the source file, the
+#            number of texts n and the number of ids m
+#   ids      m ids, every text's one after another, zero padded to a
+#            multiple of 8 bytes
+#   offsets  n + 1 uint64 offsets into ids of the first id of each text
+# The header is written last, once n and m are known, so a file cut
+# short while being written is never mistaken for a complete one.
+MAGIC = b'\x93TOKCORP'
+VERSION = 1
+HEADER = struct.Struct('8sIcc2x16sQqQQ')
+_FLUSH = 1 << 20
+
+
+def id_typecode(vocabSize: int) -> str:
+    """
+    Returns the array typecode of the smallest unsigned type that holds
+    every id of a vocabulary of vocabSize tokens.
+    """
+    return 'H' if vocabSize <= 1 << 16 else 'I'
+
+
+def write_encoded_corpus(fname: str, rows: Iterable, typecode: str,
+                         fingerprint: bytes, addSpecialTokens: bool = False,
+                         sourceSize: int = 0, sourceMtime: int = 0):
+    """
+    Writes rows (an iterable of lists of ids, one per text) to fname in
+    the format above, holding at most about a million ids in memory.
+    """
+    offsets = array('Q', [0])
+    buffer = array(typecode)
+    itemsize = buffer.itemsize
+    with open(fname, 'wb') as f:
+        f.write(bytes(HEADER.size))
+        for row in rows:
+            buffer.extend(row)
+            offsets.append(offsets[-1] + len(row))
+            if len(buffer) >= _FLUSH:
+                buffer.tofile(f)
+                del buffer[:]
+        buffer.tofile(f)
+        f.write(bytes(-(offsets[-1] * itemsize) % 8))
+        offsets.tofile(f)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, typecode.encode(),
+                            b'\x01' if addSpecialTokens else b'\x00',
+                            fingerprint, sourceSize, sourceMtime,
+                            len(offsets) - 1, offsets[-1]))
+
+
+def read_header(fname: str):
+    """
+    Returns the header fields of an encoded corpus file as a tuple
+    (typecode, addSpecialTokens, fingerprint, sourceSize, sourceMtime,
+    numTexts, numIds), or None if fname is not one.
+    """
+    try:
+        with open(fname, 'rb') as f:
+            data = f.read(HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    magic, version, typecode, special, fingerprint, size, mtime, numTexts, numIds = \
+        HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    return (typecode.decode(), special == b'\x01', fingerprint, size, mtime,
+            numTexts, numIds)
+
+
+class EncodedCorpus:
+    """
+    An encoded corpus file (see Tokenizer.encode_corpus_to_file) opened
+    with mmap. Texts and windows are memoryview slices of the mapped
+    ids, so reading them copies nothing; call .tolist() on one to get
+    a list of ints.
+
+    Attributes:
+        fname (str): Name of the file.
+        ids (memoryview): Every id in the corpus, as uint16 or uint32.
+        offsets (memoryview): Offset in ids of each text, plus the total.
+        fingerprint (bytes): Fingerprint of the vocabulary it was
+                             encoded with.
+        add_special_tokens (bool): Whether each text has bos and eos.
+
+    For example,
+        >>> tokenizer.encode_corpus_to_file('cat.txt', 'cat.ids')
+        >>> corpus = tokenizer.load_encoded_corpus('cat.ids')
+        >>> len(corpus), corpus[0].tolist()
+        >>> (3, [1, 0, 2, 3, 1, 4, 0, 5, 1, 4, 0, 8])
+        >>> [window.tolist() for window in corpus.windows(4)][:2]
+        >>> [[1, 0, 2, 3], [1, 4, 0, 5]]
+    """
+
+    def __init__(self, fname: str, fingerprint: bytes = None):
+        header = read_header(fname)
+        if header is None:
+            raise ValueError(f'{fname} is not an encoded corpus file')
+        typecode, self.add_special_tokens, self.fingerprint, _, _, numTexts, numIds = header
+        if fingerprint is not None and fingerprint != self.fingerprint:
+            raise ValueError(f'{fname} was encoded with a different vocabulary')
+
+        self.fname = fname
+        with open(fname, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = view = memoryview(self._mmap)
+        itemsize = array(typecode).itemsize
+        start = HEADER.size
+        end = start + itemsize * numIds
+        self.ids = view[start:end].cast(typecode)
+        start = end + (-end % 8)
+        self.offsets = view[start:start + 8 * (numTexts + 1)].cast('Q')
+
+    def __reduce__(self):
+        return (EncodedCorpus, (self.fname,))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, idx: int) -> memoryview:
+        """
+        Returns the ids of text idx.
+        """
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('text index out of range')
+        return self.ids[self.offsets[idx]:self.offsets[idx + 1]]
+
+    @property
+    def num_ids(self) -> int:
+        return len(self.ids)
+
+    def window(self, start: int, length: int) -> memoryview:
+        """
+        Returns up to length ids of the whole corpus from id start on.
+        """
+        return self.ids[start:start + length]
+
+    def windows(self, length: int, stride: int = None) -> Iterator[memoryview]:
+        """
+        Yields windows of length ids over the whole corpus (texts run
+        together), starting stride ids apart (default length, i.e.,
+        no overlap). The last window may be shorter.
+        """
+        if length < 1:
+            raise ValueError('length must be at least 1')
+        stride = stride or length
+        total = len(self.ids)
+        start = 0
+        while start < total:
+            yield self.ids[start:start + length]
+            if start + length >= total:
+                return
+            start += stride
+
+    def close(self):
+        """
+        Releases the views and unmaps the file (slices of ids still in
+        use must be released first).
+        """
+        self.ids.release()
+        self.offsets.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def source_stamp(fname: str):
+    """
+    Returns the (size, mtime in ns) of fname, to tell when it changed.
+    """
+    stat = os.stat(fname)
+    return stat.st_size, stat.st_mtime_ns
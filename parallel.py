@@ -0,0 +1,165 @@
+import multiprocessing
+from itertools import islice
+from typing import Iterable, List
+
+from tokenizer import Tokenizer, _pad_rows
+
+# The tokenizer each worker process encodes with. It is set once per
+# worker by _init_worker, so the vocabulary is shipped to every worker
+# a single time rather than with every chunk of texts.
+_workerTokenizer = None
+
+
+def _init_worker(tokenizer: Tokenizer):
+    global _workerTokenizer
+    _workerTokenizer = tokenizer
+
+
+def _encode_chunk(args) -> List[List[int]]:
+    texts, add_special_tokens, truncate = args
+    return [_workerTokenizer.encode_fast(text,
+                                         add_special_tokens=add_special_tokens,
+                                         truncate=truncate)
+            for text in texts]
+
+
+def _chunks(texts: Iterable[str], chunksize: int):
+    texts = iter(texts)
+    while True:
+        chunk = list(islice(texts, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ParallelEncoder:
+    """
+    Encodes batches of texts across a pool of worker processes.
+    The tokenizer (and so its vocabulary) is sent to each worker once,
+    through the pool initializer. Texts are sent in chunks of chunksize
+    and the output keeps the order of the input.
+
+    Attributes:
+        tokenizer (Tokenizer): The tokenizer to encode with. Changes made
+                               to it after the pool starts are not seen
+                               by the workers.
+        processes (int): Number of worker processes. Default is
+                         os.cpu_count().
+        chunksize (int): Number of texts sent to a worker at a time.
+                         Default is 256.
+
+    For example,
+        >>> from tokenizer import Tokenizer
+        >>> from parallel import ParallelEncoder
+        >>> tokenizer = Tokenizer()
+        >>> tokenizer.load_tokenizer('ToyVocab.txt')
+        >>> with ParallelEncoder(tokenizer, processes=4) as encoder:
+        ...     encoder.encode(['the cat', 'the cat eats'], padding=True)
+        >>> [[0, 2, 9], [0, 2, 4]]
+    """
+
+    def __init__(self, tokenizer: Tokenizer,
+                 processes: int = None,
+                 chunksize: int = 256):
+        if chunksize < 1:
+            raise ValueError('chunksize must be at least 1')
+        self.tokenizer = tokenizer
+        self.processes = processes
+        self.chunksize = chunksize
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def pool(self):
+        """
+        The worker pool, started on first use.
+        """
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.processes,
+                                              initializer=_init_worker,
+                                              initargs=(self.tokenizer,))
+        return self._pool
+
+    def close(self):
+        """
+        Shuts down the worker pool (if started).
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def iter_encode(self, texts: Iterable[str],
+                    add_special_tokens: bool = False,
+                    truncate: bool = False):
+        """
+        Lazily yields the encoding of each text, in input order. texts
+        may be any iterable (e.g., an open file), and is consumed
+        chunk by chunk as the workers need more input.
+
+        Args:
+            texts (Iterable[str]): Texts to encode.
+            add_special_tokens (bool): Whether to add eos and bos to each text.
+            truncate (bool): Whether to truncate each text to
+                             maxSequenceLength.
+
+        Yields:
+            List[int]: The ids of each text.
+        """
+        jobs = ((chunk, add_special_tokens, truncate)
+                for chunk in _chunks(texts, self.chunksize))
+        for rows in self.pool.imap(_encode_chunk, jobs):
+            yield from rows
+
+    def encode(self, texts: Iterable[str],
+               add_special_tokens: bool = False,
+               padding: bool = False,
+               truncate: bool = False) -> List[List[int]]:
+        """
+        Encodes a batch of texts in parallel. Returns the same as
+        tokenizer.encode(list(texts), ...), with padding done once all
+        rows are back.
+
+        Args:
+            texts (Iterable[str]): Texts to encode.
+            add_special_tokens (bool): Whether to add eos and bos to each text.
+            padding (bool): Whether to pad to the maximum length in the batch.
+            truncate (bool): Whether to truncate each text to
+                             maxSequenceLength.
+
+        Returns:
+            List[List[int]]: The encoding of each text.
+        """
+        rows = list(self.iter_encode(texts,
+                                     add_special_tokens=add_special_tokens,
+                                     truncate=truncate))
+        if padding:
+            _pad_rows(rows, self.tokenizer._pad_id())
+        return rows
+
+    def encode_file(self, fname: str,
+                    add_special_tokens: bool = False,
+                    padding: bool = False,
+                    truncate: bool = False) -> List[List[int]]:
+        """
+        Encodes each line of the file fname in parallel, reading it
+        as the workers consume it.
+
+        Args:
+            fname (str): Name of file to encode.
+            add_special_tokens (bool): Whether to add eos and bos to each line.
+            padding (bool): Whether to pad to the maximum length in the file.
+            truncate (bool): Whether to truncate each line to
+                             maxSequenceLength.
+
+        Returns:
+            List[List[int]]: The encoding of each line.
+        """
+        with open(fname) as f:
+            return self.encode(f, add_special_tokens=add_special_tokens,
+                               padding=padding, truncate=truncate)
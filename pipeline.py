@@ -0,0 +1,326 @@
+import queue
+import random
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter
+from typing import Dict, Iterator, List, Union
+
+import parallel
+from parallel import _init_worker
+from tokenizer import Tokenizer
+
+# Put on the queue by the reader once every batch of an epoch is.
+_DONE = object()
+
+# Seconds the reader blocks on a full queue before checking whether
+# the pipeline was stopped.
+_POLL = 0.05
+
+
+def _encode_padded(args):
+    texts, add_special_tokens, truncate, return_tensors = args
+    return parallel._workerTokenizer.encode_batch(texts,
+                                                  add_special_tokens=add_special_tokens,
+                                                  padding=True,
+                                                  truncate=truncate,
+                                                  return_tensors=return_tensors)
+
+
+class DataPipeline:
+    """
+    Feeds a training loop with padded batches encoded in the background.
+    A reader thread reads the lines of files (one text per line), passes
+    them through a shuffling buffer (if specified), groups them into
+    batches and hands each batch to a worker, which encodes and pads it
+    as encode_batch does. Up to prefetch batches wait in a queue for the
+    training loop; when it is full the reader blocks, so reading and
+    encoding never run more than prefetch batches ahead. Batches come
+    out in the order they were formed, so with a seed each epoch yields
+    the same batches however the workers are scheduled.
+
+    By default batches are encoded on a single worker thread, which
+    keeps the training loop from waiting on encode as long as it
+    releases the GIL (e.g., while the model runs). processes > 0 encodes
+    on that many worker processes instead (the tokenizer is sent to each
+    of them once, as with ParallelEncoder).
+
+    Attributes:
+        tokenizer (Tokenizer): The tokenizer to encode with. With
+                               processes > 0, changes made to it after
+                               the workers start are not seen by them.
+        files (List[str]): Names of the files to read, in order.
+        batchSize (int): Number of texts in a batch (the last batch of
+                         an epoch may be smaller). Default is 32.
+        prefetch (int): Most batches queued ahead of the training loop.
+                        Default is 8.
+        shuffleBuffer (int): Number of lines to draw each line at random
+                             from, or 0 for no shuffling. Default is 0.
+        seed (int): Seed of the shuffling (epoch k is shuffled with
+                    seed and k), or None to shuffle differently on every
+                    run. Default is None.
+        processes (int): Number of worker processes, or 0 for one
+                         worker thread. Default is 0.
+        add_special_tokens (bool): Whether to add eos and bos to each text.
+                                   Default is False.
+        truncate (bool): Whether to truncate each text to
+                         maxSequenceLength. Default is False.
+        return_tensors (str): None for lists of ids or "np" for NumPy
+                              arrays (see encode_batch). Default is None.
+        epoch (int): Number of epochs started so far.
+
+    For example,
+        >>> from tokenizer import Tokenizer
+        >>> from pipeline import DataPipeline
+        >>> tokenizer = Tokenizer()
+        >>> tokenizer.load_tokenizer('ToyVocab.txt')
+        >>> # lines.txt holds "the cat eats", "the cat" and "the"
+        >>> with DataPipeline(tokenizer, ['lines.txt'], batchSize=2) as pipeline:
+        ...     for batch in pipeline:
+        ...         print(batch)
+        >>> [[0, 2, 4], [0, 2, 9]]
+        >>> [[0]]
+    """
+
+    def __init__(self, tokenizer: Tokenizer,
+                 files: Union[str, List[str]],
+                 batchSize: int = 32,
+                 prefetch: int = 8,
+                 shuffleBuffer: int = 0,
+                 seed: int = None,
+                 processes: int = 0,
+                 add_special_tokens: bool = False,
+                 truncate: bool = False,
+                 return_tensors: str = None):
+        if batchSize < 1:
+            raise ValueError('batchSize must be at least 1')
+        if prefetch < 1:
+            raise ValueError('prefetch must be at least 1')
+        if shuffleBuffer < 0:
+            raise ValueError('shuffleBuffer must not be negative')
+        if return_tensors not in (None, 'np'):
+            raise ValueError(f'Unsupported return_tensors: {return_tensors!r}')
+        self.tokenizer = tokenizer
+        self.files = [files] if isinstance(files, str) else list(files)
+        self.batchSize = batchSize
+        self.prefetch = prefetch
+        self.shuffleBuffer = shuffleBuffer
+        self.seed = seed
+        self.processes = processes
+        self.add_special_tokens = add_special_tokens
+        self.truncate = truncate
+        self.return_tensors = return_tensors
+        self.epoch = 0
+        self._executor = None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def executor(self):
+        """
+        The worker thread or process pool, started on first use.
+        """
+        if self._executor is None:
+            if self.processes > 0:
+                self._executor = ProcessPoolExecutor(self.processes,
+                                                     initializer=_init_worker,
+                                                     initargs=(self.tokenizer,))
+                # Start every worker now, before the reader thread does
+                list(self._executor.map(_encode_padded,
+                                        [([], False, False, None)] * self.processes))
+            else:
+                self._executor = ThreadPoolExecutor(1)
+        return self._executor
+
+    def close(self):
+        """
+        Shuts down the workers (if started).
+        """
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __iter__(self) -> Iterator:
+        """
+        Yields the padded batches of one epoch (a pass over every file),
+        as encode_batch returns them. Stopping early (e.g., breaking out
+        of the loop) stops the reader and drops the queued batches.
+        """
+        if self.seed is None:
+            rng = random.Random()
+        else:
+            rng = random.Random(f'{self.seed}:{self.epoch}')
+        self.epoch += 1
+
+        executor = self.executor
+        batches = queue.Queue(self.prefetch)
+        stop = threading.Event()
+        reader = threading.Thread(target=self._read,
+                                  args=(executor, rng, batches, stop),
+                                  daemon=True)
+        reader.start()
+        try:
+            while True:
+                depth = batches.qsize()
+                start = perf_counter()
+                item = batches.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                ready = item.done()
+                batch = item.result()
+                waited = perf_counter() - start
+                with self._lock:
+                    self._depths.append(depth)
+                    self._batches += 1
+                    self._texts += len(batch['lengths'] if self.return_tensors else batch)
+                    if not (depth and ready):
+                        self._stalls += 1
+                        self._stallSeconds += waited
+                yield batch
+        finally:
+            # The reader sees stop within _POLL seconds and submits 
+            # nothing more, so what it queued before can be cancelled
+            stop.set()
+            reader.join()
+            while True:
+                try:
+                    item = batches.get_nowait()
+                except queue.Empty:
+                    break
+                if not (item is _DONE or isinstance(item, BaseException)):
+                    item.cancel()
+
+    def _lines(self, rng: random.Random) -> Iterator[str]:
+        """
+        Yields the lines of the files, through the shuffling buffer: once
+        it is full, each new line takes the place of a line drawn from
+        it at random, and what is left at the end comes out shuffled.
+        """
+        buffer = []
+        for fname in self.files:
+            with open(fname) as f:
+                if self.shuffleBuffer < 2:
+                    yield from f
+                    continue
+                for line in f:
+                    if len(buffer) < self.shuffleBuffer:
+                        buffer.append(line)
+                        continue
+                    idx = rng.randrange(len(buffer))
+                    yield buffer[idx]
+                    buffer[idx] = line
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def _read(self, executor, rng: random.Random,
+              batches: queue.Queue, stop: threading.Event):
+        """
+        Runs in the reader thread: sends each batch of lines to the
+        workers and queues its future, then queues _DONE (or the error
+        that stopped it).
+        """
+        try:
+            texts = []
+            for line in self._lines(rng):
+                texts.append(line)
+                if len(texts) == self.batchSize:
+                    if not self._send(executor, texts, batches, stop):
+                        return
+                    texts = []
+            if texts and not self._send(executor, texts, batches, stop):
+                return
+            self._put(batches, _DONE, stop)
+        except BaseException as error:
+            self._put(batches, error, stop)
+
+    def _send(self, executor, texts: List[str],
+              batches: queue.Queue, stop: threading.Event) -> bool:
+        """
+        Submits texts to the workers and queues the future (see _put),
+        unless the pipeline was stopped. Returns False if it was.
+        """
+        if stop.is_set():
+            return False
+        return self._put(batches, self._submit(executor, texts), stop)
+
+    def _submit(self, executor, texts: List[str]):
+        if self.processes > 0:
+            return executor.submit(_encode_padded, (texts, self.add_special_tokens,
+                                                    self.truncate, self.return_tensors))
+        return executor.submit(self.tokenizer.encode_batch, texts,
+                               add_special_tokens=self.add_special_tokens,
+                               padding=True,
+                               truncate=self.truncate,
+                               return_tensors=self.return_tensors)
+
+    def _put(self, batches: queue.Queue, item, stop: threading.Event) -> bool:
+        """
+        Queues item, blocking while the queue is full (the time blocked
+        counts as backpressure). Returns False (and cancels item) if the
+        pipeline was stopped first.
+        """
+        if stop.is_set():
+            if not isinstance(item, BaseException) and item is not _DONE:
+                item.cancel()
+            return False
+        try:
+            batches.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        start = perf_counter()
+        try:
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=_POLL)
+                    return True
+                except queue.Full:
+                    pass
+            if not isinstance(item, BaseException) and item is not _DONE:
+                item.cancel()
+            return False
+        finally:
+            with self._lock:
+                self._backpressureSeconds += perf_counter() - start
+
+    def stats(self) -> Dict:
+        """
+        Returns counters since the last reset_stats: the number of
+        batches and texts yielded, the number of batches the training
+        loop had to wait for (stalls) and the seconds it waited in all,
+        the mean, minimum and maximum number of batches queued when it
+        asked for the next one over the last 10000 batches (the queue
+        depth; 0 means it was ahead of the workers), and the seconds the
+        reader was blocked on a full queue (backpressure; the workers
+        were ahead of it).
+        """
+        with self._lock:
+            depths = list(self._depths)
+            return {'batches': self._batches,
+                    'texts': self._texts,
+                    'stalls': self._stalls,
+                    'stall_seconds': self._stallSeconds,
+                    'queue_depth': {'mean': sum(depths) / len(depths) if depths else 0.0,
+                                    'min': min(depths, default=0),
+                                    'max': max(depths, default=0)},
+                    'backpressure_seconds': self._backpressureSeconds}
+
+    def reset_stats(self):
+        """
+        Zeroes the counters reported by stats.
+        """
+        with self._lock:
+            self._depths = deque(maxlen=10000)
+            self._batches = 0
+            self._texts = 0
+            self._stalls = 0
+            self._stallSeconds = 0.0
+            self._backpressureSeconds = 0.0
@@ -0,0 +1,53 @@
+from typing import Dict
+
+# Stages of encode that EncodeProfiler times:
+#   preprocess  the regex pass of preprocess
+#   split       splitting the preprocessed text into tokens
+#   lookup      converting the tokens to ids
+#   cache       the chunk cache path (replaces the three above when on)
+#   finish      adding special tokens and truncating
+#   padding     padding the rows of a batch
+STAGES = ('preprocess', 'split', 'lookup', 'cache', 'finish', 'padding')
+
+
+class EncodeProfiler:
+    """
+    Cumulative per-stage timers and counters for Tokenizer.encode
+    (see Tokenizer.enable_profiling).
+
+    Attributes:
+        seconds (dict): Total seconds spent in each stage in STAGES.
+        calls (int): Number of calls to encode.
+        texts (int): Number of texts encoded.
+        duplicates (int): Number of texts of batches that repeated an 
+                          earlier text of their batch, and so were not 
+                          encoded again.
+        tokens (int): Number of token ids produced (before special
+                      tokens, padding and truncation).
+        unk (int): Number of those ids that were the unk token id.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Zeroes every timer and counter.
+        """
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.calls = 0
+        self.texts = 0
+        self.duplicates = 0
+        self.tokens = 0
+        self.unk = 0
+
+    def as_dict(self) -> Dict:
+        """
+        Returns the timers and counters as a plain (JSON-serialisable) dict.
+        """
+        return {'seconds': dict(self.seconds),
+                'calls': self.calls,
+                'texts': self.texts,
+                'duplicates': self.duplicates,
+                'tokens': self.tokens,
+                'unk': self.unk}
@@ -0,0 +1,60 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import trie as Tr
+
+
+def testTokenTrie():
+
+    trie = Tr.TokenTrie(['<s>', 'new york', 'new york city', 'a.b', ']'])
+    assert list(trie.split('<s>I love new york city!')) == \
+        [(True, '<s>'), (False, 'I love '), (True, 'new york city'), (False, '!')]
+    assert list(trie.split('new yor new york]a.b')) == \
+        [(False, 'new yor '), (True, 'new york'), (True, ']'), (True, 'a.b')]
+    assert list(trie.split('')) == []
+    assert list(Tr.TokenTrie().split('plain')) == [(False, 'plain')]
+    assert trie.longest_match('new york ci', 0) == 8
+    assert trie.spaced and not Tr.TokenTrie(['<s>', 'a.b']).spaced
+
+
+def testAddTokens():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=10)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    plain = T.Tokenizer(maxSequenceLength=10)
+    plain.load_tokenizer('./tests/TestVocab.txt')
+
+    texts = ['Is the man tall?', 'the <unk> man </s> <pad>', 'x</s>y', '< unk >']
+    assert tokenizer.add_tokens(['tall man', '<sep>', 'is', 'C++']) == 3
+    assert tokenizer.idx2word[-3:] == ['tall man', '<sep>', 'C++']
+    for text in texts:
+        assert tokenizer.encode(text) == plain.encode(text), \
+            f"Registering added tokens changed the encoding of {text!r}"
+
+    assert tokenizer.encode('the tall man<sep>C++ is Tall man') == [1, 11, 12, 13, 0, 4, 2]
+    assert tokenizer.word_tokenize('the tall man<sep>!') == ['the', 'tall man', '<sep>', '!']
+
+    cached = T.Tokenizer(maxSequenceLength=10, cacheSize=32)
+    cached.load_tokenizer('./tests/TestVocab.txt')
+    assert cached.encode('the tall man') == [1, 4, 2]
+    cached.add_tokens(['tall man'])
+    assert cached.encode('the tall man the tall man') == [1, 11, 1, 11]
+
+    cached.enable_profiling()
+    tokenizer.enable_profiling()
+    assert cached.encode('the tall man') == tokenizer.encode('the tall man') == [1, 11]
+
+
+def testAddTokensThenCreateVocab():
+
+    tokenizer = T.Tokenizer()
+    tokenizer.add_tokens(['cat jumps'])
+    tokenizer.create_vocab('cat.txt', freqThreshold=1)
+    assert tokenizer.idx2word[-1] == 'cat jumps'
+    assert tokenizer.word_tokenize('the cat jumps over') == ['the', 'cat jumps', 'over']
+    assert tokenizer.encode('the cat jumps over') == \
+        [tokenizer.word2idx[token] for token in ('the', 'cat jumps', 'over')]
+
+    tokenizer.create_bpe_vocab('cat.txt', vocabSize=60)
+    assert tokenizer.encode('the cat jumps') == \
+        [tokenizer.word2idx['the'], tokenizer.word2idx['cat jumps']]
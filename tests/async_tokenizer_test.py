@@ -0,0 +1,34 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import asynctokenizer as A
+import asyncio
+
+
+def testAsyncTokenizer():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=6)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+
+    texts = ['Is the man tall?', '', 'Or is the man who is tall tall?',
+             'the <unk> man </s>'] * 10
+    options = [{}, {'add_special_tokens': True, 'truncate': True}]
+
+    async def run(processes):
+        async with A.AsyncTokenizer(tokenizer, maxBatchSize=16, maxDelay=0.01,
+                                    processes=processes) as encoder:
+            results = await asyncio.gather(*[encoder.encode(text, **options[i % 2])
+                                             for i, text in enumerate(texts)])
+            single = await encoder.encode('the man')
+            return results, single, encoder.stats()
+
+    for processes in (0, 1):
+        results, single, stats = asyncio.run(run(processes))
+        assert results == [tokenizer.encode_fast(text, **options[i % 2])
+                           for i, text in enumerate(texts)], \
+            f"AsyncTokenizer.encode differs from encode_fast with {processes} processes"
+        assert single == tokenizer.encode_fast('the man')
+        assert stats['requests'] == len(texts) + 1
+        assert stats['batches'] == 4
+        assert stats['mean_batch_size'] == (len(texts) + 1) / 4
+        assert stats['latency_ms']['p50'] <= stats['latency_ms']['max']
@@ -0,0 +1,39 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import pickle
+import tempfile
+
+
+def testBinaryVocab():
+
+    text = T.Tokenizer(maxSequenceLength=10)
+    text.load_tokenizer('./tests/TestVocab.txt')
+    text.idx2word.extend(['état', '日本', ''])
+    text.word2idx.update({'état': 11, '日本': 12, '': 13})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'vocab.bin')
+        text.save_tokenizer(fname, binary=True)
+
+        tokenizer = T.Tokenizer(maxSequenceLength=10)
+        tokenizer.load_tokenizer(fname)
+        assert len(tokenizer) == len(text)
+        assert list(tokenizer.idx2word) == text.idx2word
+        assert dict(tokenizer.word2idx) == text.word2idx
+        assert tokenizer.idx2word[-1] == '' and tokenizer.idx2word[1:3] == ['the', 'man']
+        assert 'état' in tokenizer.word2idx and 'etat' not in tokenizer.word2idx
+        assert tokenizer.word2idx.get('cat', -1) == -1
+        assert tokenizer.unk_token_id == 9
+
+        texts = ['Is the man tall?', 'Or is the man who is tall tall?']
+        assert tokenizer.encode(texts, add_special_tokens=True, padding=True) == \
+            text.encode(texts, add_special_tokens=True, padding=True)
+        assert tokenizer.convert_tokens_to_ids(['the', 'cat']) == [1, 9]
+        assert tokenizer.decode([[0, 1], [11, 12]]) == [['is', 'the'], ['état', '日本']]
+
+        copy = pickle.loads(pickle.dumps(tokenizer))
+        assert copy.encode(texts) == tokenizer.encode(texts)
+
+        tokenizer.load_tokenizer('./ToyVocab.txt')
+        assert tokenizer.word2idx['cat'] == 15 and tokenizer.idx2word[15] == 'cat'
@@ -0,0 +1,52 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import bpe as B
+import tempfile
+
+
+def testTrainBPE():
+
+    symbols, merges = B.train_bpe({'low': 5, 'lower': 2, 'newest': 6, 'widest': 3}, 10)
+    assert symbols[0] == '##e'
+    assert merges[:3] == [('##e', '##s'), ('##es', '##t'), ('##o', '##w')]
+    bpe = B.BPE(merges)
+    assert bpe.segment('newest') == ['newest']
+    assert bpe.segment('lowest') == ['low', '##est']
+    assert bpe.segment('x') == ['x']
+    assert B.BPE([('l', '##o'), ('lo', '##w')]).segment('lower') == ['low', '##e', '##r']
+
+
+def testBPEMode():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=10)
+    tokenizer.create_bpe_vocab('./cat.txt', vocabSize=60)
+    assert len(tokenizer) <= 60
+    assert tokenizer.word_tokenize('The catnip jumps') == \
+        ['the', 'cat', '##n', '##i', '##p', 'jumps']
+    assert tokenizer.word_tokenize('<s> cat </s>') == ['<s>', 'cat', '</s>']
+
+    ids = tokenizer.encode('The catnip jumps')
+    assert tokenizer.unk_token_id not in ids
+    assert tokenizer.decode(ids) == ['the', 'cat', '##n', '##i', '##p', 'jumps']
+    assert tokenizer.encode(['The cat', 'unhappy'], add_special_tokens=True) == \
+        [tokenizer.encode_fast(text, add_special_tokens=True)
+         for text in ['The cat', 'unhappy']]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for binary in (False, True):
+            fname = os.path.join(tmp, 'vocab.bin' if binary else 'vocab.txt')
+            tokenizer.save_tokenizer(fname, binary=binary)
+            loaded = T.Tokenizer(maxSequenceLength=10)
+            loaded.load_tokenizer(fname)
+            assert loaded.encode('The catnip jumps') == ids
+
+        words = T.Tokenizer()
+        words.create_vocab('./cat.txt', freqThreshold=1)
+        fname = os.path.join(tmp, 'words.txt')
+        tokenizer.save_tokenizer(fname)
+        words.save_tokenizer(fname)
+        assert not os.path.exists(fname + '.merges')
+        loaded = T.Tokenizer()
+        loaded.load_tokenizer(fname)
+        assert loaded.bpe is None
@@ -0,0 +1,39 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import batching as B
+import random
+
+
+def testBucketedBatcher():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=10)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+
+    rng = random.Random(0)
+    texts = [' '.join(rng.choice(tokenizer.idx2word) for _ in range(rng.randint(0, 40)))
+             for _ in range(200)]
+
+    for maxTokens, maxBatchSize in ((64, None), (1, None), (4096, 8)):
+        batcher = B.BucketedBatcher(tokenizer, maxTokens=maxTokens, maxBatchSize=maxBatchSize)
+        for kwargs in ({}, {'add_special_tokens': True, 'truncate': True}):
+            batches, indices = batcher.batch(texts, **kwargs)
+            assert sorted(idx for batch in indices for idx in batch) == list(range(len(texts)))
+            for batch in batches:
+                assert len(set(map(len, batch))) == 1
+                assert len(batch) == 1 or len(batch) * len(batch[0]) <= maxTokens
+                assert maxBatchSize is None or len(batch) <= maxBatchSize
+
+            expected = [tokenizer.encode_fast(text, **kwargs) for text in texts]
+            restored = B.BucketedBatcher.restore(batches, indices)
+            pad = tokenizer.pad_token_id
+            for row, ids in zip(restored, expected):
+                assert row[:len(ids)] == ids and set(row[len(ids):]) <= {pad}
+
+            stats = batcher.stats()
+            assert stats['texts'] == len(texts) and stats['batches'] == len(batches)
+            assert stats['tokens'] == sum(map(len, expected))
+            assert stats['padded_tokens'] == sum(len(batch) * len(batch[0]) for batch in batches)
+            assert stats['efficiency'] >= stats['unbucketed_efficiency']
+
+    assert batcher.batch([]) == ([], [])
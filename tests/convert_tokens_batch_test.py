@@ -0,0 +1,43 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import tempfile
+
+
+def testConvertTokens2IDsBatch():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=10)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+
+    batch = [['is', 'the', 'man', 'who', 'is', 'tall', '?'],
+             [], ['<s>', 'what', 'the', '<pad>'], ['Tall', '</s>']]
+    expected = [tokenizer.convert_tokens_to_ids(tokens) for tokens in batch]
+    assert tokenizer.convert_tokens_to_ids_batch(batch) == expected
+    assert tokenizer.convert_tokens_to_ids_batch(batch, add_special_tokens=True) == \
+        [[tokenizer.bos_token_id] + ids + [tokenizer.eos_token_id] for ids in expected]
+
+    # The cached special ids follow the vocabulary and the special tokens
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'vocab.bin')
+        other = T.Tokenizer()
+        other.idx2word = ['<unk>', '</s>', '<s>', 'the']
+        other.word2idx = {word: idx for idx, word in enumerate(other.idx2word)}
+        other.save_tokenizer(fname, binary=True)
+        tokenizer.load_tokenizer(fname)
+        assert tokenizer.convert_tokens_to_ids_batch([['the', 'man']], add_special_tokens=True) == \
+            [[2, 3, 0, 1]]
+        assert tokenizer.pad_token_id is None
+
+    tokenizer.unk_token = 'the'
+    assert tokenizer.convert_tokens_to_ids_batch([['man']]) == [[3]]
+
+    # So do tokens added to word2idx in place
+    tokenizer = T.Tokenizer()
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    del tokenizer.word2idx['<pad>']
+    assert tokenizer.pad_token_id is None
+    assert tokenizer.convert_tokens_to_ids_batch([['<pad>']]) == [[tokenizer.unk_token_id]]
+    tokenizer.word2idx['<pad>'] = 2
+    assert tokenizer.pad_token_id == 2
+    assert tokenizer.convert_tokens_to_ids_batch([['<pad>']]) == [[2]]
+    assert tokenizer.encode(['the', 'the man'], padding=True) == [[1, 2], [1, 2]]
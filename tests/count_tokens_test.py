@@ -0,0 +1,49 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+import tempfile
+
+
+def testCountTokens():
+
+    rng = random.Random(0)
+    pieces = ['Is', 'the', 'man', 'cat', '?', ',', '<', '>', '/', 'unk', '</s>', '<unk>',
+              'tall man', 'é', '€', '\n', '\t', ' ', '']
+    texts = ['', ' ', '<', '>', '/', '< unk >', '<>', '/ >', 'the man', 'the man,\n who?'] + \
+        [''.join(rng.choice(pieces) + rng.choice(['', ' ']) for _ in range(rng.randint(0, 60)))
+         for _ in range(2000)]
+
+    for lower in (True, False):
+        tokenizer = T.Tokenizer(lower=lower)
+        tokenizer.load_tokenizer('./tests/TestVocab.txt')
+        for added in (False, True):
+            if added:
+                tokenizer.add_tokens(['tall man'])
+            for text in texts:
+                ids = tokenizer.encode(text, add_special_tokens=True)
+                assert tokenizer.count_tokens(text) == len(ids) - 2, \
+                    f"count differs on {text!r}"
+                assert tokenizer.count_tokens(text, add_special_tokens=True, return_unk=True) \
+                    == (len(ids), ids.count(tokenizer.unk_token_id)), \
+                    f"unk count differs on {text!r}"
+
+            ids = tokenizer.encode(texts)
+            assert tokenizer.count_tokens(texts) == [len(row) for row in ids]
+            assert tokenizer.count_tokens_batch(texts, return_unk=True) == \
+                [(len(row), row.count(tokenizer.unk_token_id)) for row in ids]
+
+
+def testCountTokensBPE():
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        with open(fname, 'w') as f:
+            f.write('lower lowest newer newest <unk> low\n' * 20)
+        tokenizer = T.Tokenizer()
+        tokenizer.create_bpe_vocab(fname, vocabSize=30)
+
+    for text in ['', 'lowest newest', 'the lower <unk> knew', 'slower\n']:
+        ids = tokenizer.encode(text)
+        assert tokenizer.count_tokens(text, return_unk=True) == \
+            (len(ids), ids.count(tokenizer.unk_token_id))
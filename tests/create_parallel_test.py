@@ -0,0 +1,32 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+import tempfile
+
+
+def testCreateVocabWorkers():
+
+    rng = random.Random(0)
+    words = ['the', 'cat', 'sat', 'on', 'mat', 'dog', 'ran', ',', '.', '?',
+             '<unk>', 'Zebra', 'état', 'end</s>']
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        with open(fname, 'w', encoding='utf-8') as f:
+            for _ in range(3000):
+                f.write(' '.join(rng.choices(words, k=rng.randint(0, 12))) + '\n')
+
+        serial = T.Tokenizer()
+        serial.create_vocab(fname, freqThreshold=5)
+        for workers in (2, 3, 7):
+            tokenizer = T.Tokenizer()
+            tokenizer.create_vocab(fname, freqThreshold=5, workers=workers)
+            assert tokenizer.idx2word == serial.idx2word, \
+                f"create_vocab with {workers} workers differs from the serial build"
+            assert tokenizer.word2idx == serial.word2idx
+
+        empty = os.path.join(tmp, 'empty.txt')
+        open(empty, 'w').close()
+        tokenizer = T.Tokenizer()
+        tokenizer.create_vocab(empty, workers=4)
+        assert tokenizer.idx2word == ['<unk>', '<pad>', '<s>', '</s>']
@@ -0,0 +1,43 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import tempfile
+
+
+def testCreateVocabStreaming():
+
+    tokenizer = T.Tokenizer()
+    tokenizer.create_vocab('./cat.txt', freqThreshold=1, addSpecialTokens=False)
+    assert tokenizer.word2idx == {'cat': 0, 'the': 1, 'jumps': 2, 'over': 3,
+                                  'other': 4, '.': 5, 'unhappy': 6, ',': 7}
+    assert tokenizer.idx2word == list(tokenizer.word2idx)
+
+    tokenizer.create_vocab('./cat.txt', freqThreshold=2)
+    assert tokenizer.idx2word == ['cat', 'the', '<unk>', '<pad>', '<s>', '</s>']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        with open(fname, 'w') as f:
+            for i in range(2000):
+                f.write(f'the cat <unk> rare{i} sat .\n')
+
+        tokenizer.create_vocab(fname, freqThreshold=10)
+        full = list(tokenizer.idx2word)
+        assert full == ['the', 'cat', '<unk>', 'sat', '.', '<pad>', '<s>', '</s>']
+
+        tokenizer.create_vocab(fname, freqThreshold=10, maxEntries=100)
+        assert tokenizer.idx2word == full, "Pruning should not drop frequent words"
+
+    # Ties at the cut-off count are broken, not all dropped
+    counts = T.Counter({'a': 3, 'b': 1, 'c': 2, 'd': 1, 'e': 1})
+    T._prune_counts(counts, 3)
+    assert counts == {'a': 3, 'c': 2, 'b': 1}
+    tokenizer.create_vocab('./cat.txt', freqThreshold=0, addSpecialTokens=False, maxEntries=4)
+    assert len(tokenizer) >= 2 and 'cat' in tokenizer.word2idx
+    tokenizer.create_vocab('./cat.txt', freqThreshold=0, addSpecialTokens=False, maxEntries=2)
+    assert len(tokenizer) >= 1
+    try:
+        tokenizer.create_vocab('./cat.txt', maxEntries=1)
+        assert False, 'maxEntries=1 was accepted'
+    except ValueError:
+        pass
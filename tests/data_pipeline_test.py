@@ -0,0 +1,86 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import pipeline as P
+import tempfile
+import time
+
+
+def testDataPipeline():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=6)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    lines = [f'Is the man {"tall " * (i % 7)}?' for i in range(50)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        names = []
+        for part in range(2):
+            fname = os.path.join(tmp, f'part{part}.txt')
+            with open(fname, 'w') as f:
+                f.write('\n'.join(lines[25 * part:25 * (part + 1)]) + '\n')
+            names.append(fname)
+
+        with P.DataPipeline(tokenizer, names, batchSize=8, prefetch=2,
+                            add_special_tokens=True, truncate=True) as pipeline:
+            batches = list(pipeline)
+            gold = [tokenizer.encode(lines[i:i + 8], add_special_tokens=True,
+                                     truncate=True, padding=True)
+                    for i in range(0, len(lines), 8)]
+            assert batches == gold
+            stats = pipeline.stats()
+            assert stats['batches'] == 7 and stats['texts'] == 50
+
+        # Seeded shuffling is the same on every run and differs by epoch
+        runs = []
+        for processes in (0, 2):
+            with P.DataPipeline(tokenizer, names, batchSize=8, shuffleBuffer=16,
+                                seed=3, processes=processes) as pipeline:
+                runs.append([list(pipeline), list(pipeline)])
+        assert runs[0] == runs[1]
+        first, second = runs[0]
+        assert first != second
+        pad = tokenizer.pad_token_id
+        rows = sorted([idx for idx in row if idx != pad] for batch in first for row in batch)
+        assert rows == sorted(tokenizer.encode(lines))
+        assert first != [tokenizer.encode(lines[i:i + 8], padding=True)
+                         for i in range(0, len(lines), 8)]
+
+        # A slow consumer makes the reader wait on the full queue, and 
+        # stopping early stops it
+        pipeline = P.DataPipeline(tokenizer, names, batchSize=1, prefetch=1)
+        for count, batch in enumerate(pipeline):
+            time.sleep(0.02)
+            if count == 5:
+                break
+        stats = pipeline.stats()
+        assert stats['batches'] == 6 and stats['backpressure_seconds'] > 0
+        assert stats['queue_depth']['max'] <= 1
+        pipeline.reset_stats()
+        assert pipeline.stats()['batches'] == 0
+        pipeline.close()
+
+        # Once the loop is left, at most the batch being encoded is 
+        # finished and no more are started
+        calls = []
+        encode_batch = tokenizer.encode_batch
+
+        def slowEncode(texts, **kwargs):
+            calls.append(len(texts))
+            time.sleep(0.02)
+            return encode_batch(texts, **kwargs)
+        tokenizer.encode_batch = slowEncode
+        with P.DataPipeline(tokenizer, names, batchSize=1, prefetch=4) as pipeline:
+            for count, batch in enumerate(pipeline):
+                if count == 2:
+                    started = len(calls)
+                    break
+            time.sleep(0.2)
+            assert len(calls) <= started + 1, \
+                f'{len(calls) - started} batches were encoded after stopping'
+        del tokenizer.encode_batch
+
+        try:
+            list(P.DataPipeline(tokenizer, os.path.join(tmp, 'missing.txt')))
+            assert False, 'reading a missing file should fail'
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,36 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+
+
+def testDecodeToText():
+
+    texts = ["The man, who is tall, is happy!", "Is the (tall) man's cat happy?",
+             "A well-known man; 50% of $5 and/or less.", "Who is <unk>?"]
+    tokenizer = T.Tokenizer(maxSequenceLength=10, lower=False)
+    tokenizer.idx2word = sorted({token for text in texts
+                                 for token in tokenizer.word_tokenize(text)}) + \
+        ['<pad>', '<s>', '</s>']
+    tokenizer.word2idx = {token: idx for idx, token in enumerate(tokenizer.idx2word)}
+
+    batch = tokenizer.encode(texts, add_special_tokens=True, padding=True)
+    assert tokenizer.decode_to_text(batch) == texts
+    assert tokenizer.decode_to_text(batch[0]) == texts[0]
+    special = tokenizer.encode(texts[3], add_special_tokens=True)
+    assert tokenizer.decode_to_text(special, skip_special_tokens=False) == \
+        '<s> Who is <unk>? </s>'
+    assert tokenizer.decode_to_text([]) == ''
+
+    try:
+        import numpy as np
+    except ImportError:
+        return
+    assert tokenizer.decode_to_text(np.array(batch, dtype=np.int32)) == texts
+
+
+def testDecodeToTextBPE():
+
+    tokenizer = T.Tokenizer()
+    tokenizer.create_bpe_vocab('./cat.txt', vocabSize=60)
+    ids = tokenizer.encode('The catnip jumps, unhappy.', add_special_tokens=True)
+    assert tokenizer.decode_to_text(ids) == 'the catnip jumps, unhappy.'
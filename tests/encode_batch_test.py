@@ -0,0 +1,65 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def testEncodeBatch():
+
+    word2idx = {'the': 0, 'cat': 1, 'eats': 2, '<pad>': 3, '</s>': 4, '<s>': 5,
+                '<unk>': 6}
+    tokenizer = T.Tokenizer(maxSequenceLength=5)
+    tokenizer.word2idx = word2idx
+    tokenizer.idx2word = list(word2idx)
+
+    text = ['the cat', 'the cat eats']
+    assert tokenizer.encode(text) == [[0, 1], [0, 1, 2]]
+    assert tokenizer.encode(text, padding=True) == [[0, 1, 3], [0, 1, 2]]
+    assert tokenizer.encode(text, add_special_tokens=True, padding=True) == \
+        [[5, 0, 1, 4, 3], [5, 0, 1, 2, 4]]
+
+    text = ['the cat eats the cat', 'cat']
+    assert tokenizer.encode(text, add_special_tokens=True, padding=True,
+                            truncate=True) == [[5, 0, 1, 2, 4], [5, 1, 4, 3, 3]]
+    assert tokenizer.encode_batch([]) == []
+
+    if np is None:
+        return
+
+    out = tokenizer.encode_batch(['the cat', 'the cat eats', ''],
+                                 return_tensors='np')
+    assert out['input_ids'].dtype == np.int32
+    assert out['input_ids'].tolist() == [[0, 1, 3], [0, 1, 2], [3, 3, 3]]
+    assert out['attention_mask'].tolist() == [[1, 1, 0], [1, 1, 1], [0, 0, 0]]
+    assert out['lengths'].tolist() == [2, 3, 0]
+
+    out = tokenizer.encode_batch(text, add_special_tokens=True, truncate=True,
+                                 return_tensors='np')
+    assert out['input_ids'].tolist() == [[5, 0, 1, 2, 4], [5, 1, 4, 3, 3]]
+    assert out['lengths'].tolist() == [5, 3]
+
+    out = tokenizer.encode_batch([], return_tensors='np')
+    assert out['input_ids'].shape == (0, 0)
+
+
+def testEncodeBatchNoPadToken():
+
+    tokenizer = T.Tokenizer()
+    tokenizer.word2idx = {'the': 0, 'cat': 1, '<unk>': 2}
+    tokenizer.idx2word = ['the', 'cat', '<unk>']
+    texts = ['the', 'the cat']
+    assert tokenizer.encode_batch(texts) == [[0], [0, 1]]
+    try:
+        tokenizer.encode_batch(texts, padding=True)
+        assert False, 'padding without a pad token should fail'
+    except KeyError:
+        pass
+    try:
+        tokenizer.encode(texts, padding=True)
+        assert False, 'padding without a pad token should fail'
+    except KeyError:
+        pass
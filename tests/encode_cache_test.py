@@ -0,0 +1,56 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+
+
+def testEncodeCache():
+
+    plain = T.Tokenizer(maxSequenceLength=10)
+    plain.load_tokenizer('./tests/TestVocab.txt')
+    tokenizer = T.Tokenizer(maxSequenceLength=10, cacheSize=8)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+
+    texts = ['Is the man tall?', 'is the man tall ?', 'the <unk> man </s>',
+             'a < b', 'path/ to', 'x >y', '<s> the', 'tall<', '« » <']
+    rng = random.Random(0)
+    words = ['the', 'The', 'man,', 'tall?', 'who', '<', '>', '/', '<unk>', 'cat']
+    for _ in range(300):
+        texts.append(' '.join(rng.choices(words, k=rng.randint(0, 12))))
+
+    for text in texts:
+        assert tokenizer(text) == plain(text), f"cached encode differs on {text!r}"
+        assert tokenizer.encode(text) == plain.encode(text)
+    assert tokenizer.encode(texts, padding=True) == plain.encode(texts, padding=True)
+
+    info = tokenizer.cache_info()
+    assert info['hits'] > 0 and info['misses'] > 0
+    assert 0 < info['size'] <= 8 and info['maxsize'] == 8
+
+    before = tokenizer.encode('the cat')
+    tokenizer.load_tokenizer('./ToyVocab.txt')
+    assert tokenizer.cache_info()['size'] == 0, "load_tokenizer should clear the cache"
+    assert tokenizer.encode('the cat') != before
+
+    tokenizer.word2idx = {'the': 0, 'cat': 1, '<unk>': 2}
+    assert tokenizer.encode('the cat') == [0, 1], \
+        "Replacing word2idx should invalidate the cache"
+
+    tokenizer.create_vocab('./cat.txt', freqThreshold=1)
+    assert tokenizer.encode('the cat') == [1, 0]
+    assert T.Tokenizer().cache_info()['maxsize'] == 0
+
+
+def testEncodeCacheInPlaceEdit():
+
+    plain = T.Tokenizer()
+    plain.load_tokenizer('./tests/TestVocab.txt')
+    tokenizer = T.Tokenizer(cacheSize=8)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    assert tokenizer.encode('the dog') == plain.encode('the dog')
+
+    for edited in (plain, tokenizer):
+        edited.word2idx['dog'] = len(edited.idx2word)
+        edited.idx2word.append('dog')
+    assert tokenizer.encode('the dog') == plain.encode('the dog') == \
+        [plain.word2idx['the'], plain.word2idx['dog']]
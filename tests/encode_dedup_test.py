@@ -0,0 +1,66 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def testEncodeDedup():
+
+    texts = ['Is the man tall?', 'the cat', 'Is the man tall?', 'the cat',
+             'Or is the man who is tall tall?', 'the cat']
+    tokenizer = T.Tokenizer(maxSequenceLength=6, truncation='tail')
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    for add_special_tokens in (False, True):
+        for truncate in (False, True):
+            gold = [tokenizer.encode(text, add_special_tokens=add_special_tokens,
+                                     truncate=truncate) for text in texts]
+            golden = [row + [tokenizer.pad_token_id] * (max(map(len, gold)) - len(row))
+                      for row in gold]
+            assert tokenizer.encode(texts, add_special_tokens=add_special_tokens,
+                                    truncate=truncate) == gold
+            rows = tokenizer.encode(texts, add_special_tokens=add_special_tokens,
+                                    truncate=truncate, padding=True)
+            assert rows == golden
+            # Repeated texts get rows of their own
+            assert len(set(map(id, rows))) == len(rows)
+
+    tokenizer.enable_profiling()
+    tokenizer.encode(texts)
+    assert tokenizer.stats()['texts'] == 3 and tokenizer.stats()['duplicates'] == 3
+
+    if np is None:
+        return
+    out = tokenizer.encode_batch(texts, return_tensors='np')
+    assert out['dedup_ratio'] == 0.5
+    assert np.array_equal(out['input_ids'][2], out['input_ids'][0])
+    assert tokenizer.encode_batch([], return_tensors='np')['dedup_ratio'] == 0.0
+
+
+def testTextCache():
+
+    texts = ['Is the man tall?', 'the cat', 'Is the man tall?']
+    tokenizer = T.Tokenizer(maxSequenceLength=4, textCacheSize=2)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    gold = tokenizer.encode(texts, truncate=True)
+    assert tokenizer.textCache.info() == {'hits': 0, 'misses': 2, 'size': 2, 'maxsize': 2}
+
+    rows = tokenizer.encode(texts, truncate=True)
+    assert rows == gold and tokenizer.textCache.hits == 2
+    rows[0].append(0)
+    assert tokenizer.encode(texts, truncate=True) == gold
+
+    # Options and settings are part of what is cached
+    assert tokenizer.encode(texts) == [[0, 1, 2, 4, 6], [1, 9], [0, 1, 2, 4, 6]]
+    tokenizer.maxSequenceLength = 3
+    assert tokenizer.encode(texts, truncate=True) == [[0, 1, 2], [1, 9], [0, 1, 2]]
+
+    tokenizer.add_tokens(['the cat'])
+    assert len(tokenizer.textCache) == 0
+    assert tokenizer.encode(['the cat']) == [[len(tokenizer) - 1]]
+
+    tokenizer.encode(['a', 'b', 'c'])
+    assert len(tokenizer.textCache) == 2
@@ -0,0 +1,55 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+
+
+def referenceEncode(tokenizer, text, add_special_tokens=False, truncate=False):
+    """
+    The original preprocess/split/convert_tokens_to_ids encode of a
+    single text, kept here to check the fused path against.
+    """
+    toRet = []
+    for word in tokenizer.preprocess(text).split():
+        tokenizedID = tokenizer.convert_tokens_to_ids(word)
+        if (type(tokenizedID) == list):
+            toRet.extend(tokenizedID)
+        else:
+            toRet.append(tokenizedID)
+    if (add_special_tokens):
+        toRet.insert(0, tokenizer.bos_token_id)
+        toRet.insert(len(toRet), tokenizer.eos_token_id)
+    if (truncate):
+        while (len(toRet) > tokenizer.maxSequenceLength):
+            toRet.pop()
+        if (add_special_tokens):
+            toRet.pop()
+            toRet.append(tokenizer.eos_token_id)
+    return toRet
+
+
+def testEncodeFast():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=10)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+
+    texts = ['', 'the', '<unk>', 'Is the man tall?',
+             'Is the man who is tall also quite tall though?',
+             '<s> the man </s> <pad> is < tall / >',
+             'IS THE MAN?!? who, is; TALL']
+
+    rng = random.Random(0)
+    words = tokenizer.idx2word + ['cat', 'Tall', '<', '>', '/', ',', ' ', '\n']
+    for _ in range(200):
+        texts.append(' '.join(rng.choice(words) for _ in range(rng.randint(0, 30))))
+
+    for text in texts:
+        assert list(tokenizer.iter_ids(text)) == referenceEncode(tokenizer, text), \
+            f"iter_ids differs from encode on {text!r}"
+        for add_special_tokens in (True, False):
+            for truncate in (True, False):
+                assert tokenizer.encode_fast(text, add_special_tokens=add_special_tokens,
+                                             truncate=truncate) == \
+                    referenceEncode(tokenizer, text, add_special_tokens=add_special_tokens,
+                                    truncate=truncate), \
+                    f"encode_fast differs from encode on {text!r}"
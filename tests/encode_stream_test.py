@@ -0,0 +1,45 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import tempfile
+
+
+def testEncodeStream():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=6)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+
+    lines = ['Is the man tall?', '', 'Or is the man who is tall tall?',
+             'the <unk> man </s>', 'who']
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        with open(fname, 'w') as f:
+            f.write('\n'.join(lines))
+
+        with open(fname) as f:
+            assert list(tokenizer.encode_stream(f, add_special_tokens=True, truncate=True)) == \
+                [tokenizer.encode(line, add_special_tokens=True, truncate=True)
+                 for line in lines]
+
+        flat = [i for line in lines for i in tokenizer.encode(line)]
+        with open(fname) as f:
+            windows = list(tokenizer.encode_stream(f, windows=True))
+        assert windows == [flat[i:i + 6] for i in range(0, len(flat), 6)]
+
+        for stride in (1, 2, 4):
+            with open(fname) as f:
+                windows = list(tokenizer.encode_stream(f, windows=True, stride=stride,
+                                                       add_special_tokens=True))
+            assert all(len(w) <= 6 and w[0] == 7 and w[-1] == 8 for w in windows)
+            starts = range(0, max(len(flat) - 4, 0) + stride, stride)
+            assert [w[1:-1] for w in windows] == [flat[i:i + 4] for i in starts], \
+                f"Windows with stride {stride} do not cover the stream"
+
+    assert list(tokenizer.encode_stream('the man')) == [[1, 2]]
+    assert list(tokenizer.encode_stream([], windows=True)) == []
+    try:
+        list(tokenizer.encode_stream(lines, windows=True, stride=5,
+                                     add_special_tokens=True))
+        assert 0, "A stride longer than the window should raise ValueError"
+    except ValueError:
+        pass
@@ -0,0 +1,62 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import corpus as C
+import tempfile
+
+
+def testEncodedCorpus():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=5)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+
+    texts = ['Is the man tall?', '', 'Or is the man who is tall tall?',
+             'the <unk> man </s>'] * 5
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        outname = os.path.join(tmp, 'corpus.ids')
+        with open(fname, 'w') as f:
+            f.write('\n'.join(texts) + '\n')
+
+        for add_special_tokens in (False, True):
+            corpus = tokenizer.encode_corpus_to_file(fname, outname,
+                                                     add_special_tokens=add_special_tokens)
+            expected = [tokenizer.encode_fast(text, add_special_tokens=add_special_tokens)
+                        for text in texts]
+            assert len(corpus) == len(texts)
+            assert [corpus[i].tolist() for i in range(len(corpus))] == expected
+            assert corpus[-1].tolist() == expected[-1]
+            assert corpus.ids.format == 'H'
+
+            flat = [idx for row in expected for idx in row]
+            assert [window.tolist() for window in corpus.windows(5)] == \
+                [flat[i:i + 5] for i in range(0, len(flat), 5)]
+            windows = [window.tolist() for window in corpus.windows(5, stride=2)]
+            assert windows[1] == flat[2:7] and windows[-1] == flat[2 * (len(windows) - 1):]
+            assert len(windows[-1]) <= 5 and len(windows[-2]) == 5
+            corpus.close()
+
+        # Reused while nothing changes, rewritten when the vocabulary does
+        mtime = os.stat(outname).st_mtime_ns
+        tokenizer.encode_corpus_to_file(fname, outname, add_special_tokens=True).close()
+        assert os.stat(outname).st_mtime_ns == mtime
+        assert tokenizer.load_encoded_corpus(outname).add_special_tokens
+
+        tokenizer.add_tokens(['tall man'])
+        try:
+            tokenizer.load_encoded_corpus(outname)
+            assert False, 'a corpus from another vocabulary was loaded'
+        except ValueError:
+            pass
+        corpus = tokenizer.encode_corpus_to_file(fname, outname, add_special_tokens=True)
+        assert corpus.fingerprint == tokenizer.vocab_fingerprint()
+        assert corpus[0].tolist() == tokenizer.encode_fast(texts[0], add_special_tokens=True)
+        corpus.close()
+
+        # The special tokens decide the ids too
+        tokenizer.bos_token = '<pad>'
+        corpus = tokenizer.encode_corpus_to_file(fname, outname, add_special_tokens=True)
+        assert corpus[0].tolist()[0] == tokenizer.pad_token_id
+        corpus.close()
+
+    assert C.id_typecode(65536) == 'H' and C.id_typecode(65537) == 'I'
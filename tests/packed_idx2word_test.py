@@ -0,0 +1,44 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import vocab as V
+import pickle
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def testPackedIdx2Word():
+
+    tokens = ['the', 'cat', 'état', '', '日本', '<unk>']
+    packed = V.PackedIdx2Word.from_tokens(tokens, cacheSize=2)
+    assert len(packed) == len(tokens)
+    assert list(packed) == tokens
+    assert packed[-1] == '<unk>' and packed[1:3] == ['cat', 'état']
+    assert packed.index('日本') == 4 and '' in packed
+    assert len(packed._cache) == 2, "The LRU should hold at most cacheSize tokens"
+    assert pickle.loads(pickle.dumps(packed))[2] == 'état'
+    try:
+        packed[6]
+        assert 0, "Out of range ids should raise IndexError"
+    except IndexError:
+        pass
+
+    tokenizer = T.Tokenizer(maxSequenceLength=10)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    ids = tokenizer.encode(['Is the man tall?', 'Or is the man who is tall tall?'],
+                           padding=True)
+    gold = tokenizer.decode(ids)
+
+    tokenizer.pack_idx2word(cacheSize=4)
+    assert tokenizer.decode(ids) == gold
+    assert tokenizer.decode(ids[0]) == gold[0]
+    assert tokenizer.decode([]) == []
+    assert tokenizer.convert_ids_to_tokens(2) == 'man'
+    if np is not None:
+        assert tokenizer.decode(np.array(ids, dtype=np.int32)) == gold
+
+    tokenizer.load_tokenizer('./ToyVocab.txt')
+    assert tokenizer.idx2word[tokenizer.word2idx['cat']] == 'cat'
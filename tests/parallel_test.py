@@ -0,0 +1,26 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import parallel as P
+import tempfile
+
+
+def testParallelEncoder():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=6)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+
+    texts = ['Is the man tall?', '', 'Or is the man who is tall tall?',
+             'the <unk> man </s>'] * 7
+
+    with P.ParallelEncoder(tokenizer, processes=2, chunksize=3) as encoder:
+        for kwargs in ({}, {'padding': True},
+                       {'add_special_tokens': True, 'truncate': True, 'padding': True}):
+            assert encoder.encode(texts, **kwargs) == tokenizer.encode(texts, **kwargs), \
+                f"ParallelEncoder.encode differs from encode with {kwargs}"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            fname = os.path.join(tmp, 'corpus.txt')
+            with open(fname, 'w') as f:
+                f.write('\n'.join(texts))
+            assert encoder.encode_file(fname) == tokenizer.encode(texts)
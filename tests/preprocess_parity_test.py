@@ -0,0 +1,52 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+import re
+
+
+def referencePreprocess(text, lower=True):
+    """
+    The original token-by-token preprocess, kept here to check that
+    the compiled single-pass version gives the same output.
+    """
+    toRet = ""
+    newS = re.findall(r'[\w]+|[<>!\"#$%&\'()*+,-./\\:;=?@\[\]\^\_\`\{\|\}\~\)\(]', text)
+    for word in newS:
+        if lower:
+            word = word.lower()
+        if (re.search(r'[</]', word)):
+            toRet += word
+        elif (re.search(r'>', word)):
+            toRet = toRet.rstrip()
+            toRet += word + " "
+        else:
+            toRet += word + " "
+    return toRet.strip()
+
+
+def testPreprocessParity():
+
+    texts = ["",
+             "   \n\n ",
+             " the man, who is tall, is happy!\n",
+             " The <unk> cat loves to buy food; I love him? \n\n",
+             "<s> She loves <unk> , cat </s> <pad> <pad> <pad>",
+             "a < b > c / d </ s > <<>> //",
+             "path/to/file.txt <br/> x<y>z",
+             "snake_case and __dunder__ names",
+             "ΟΔΟΣ <ΟΣ> /ΑΣ Straße İstanbul",
+             "tabs\tand\r\nmixed   whitespace\x0b\x0c",
+             "emoji 😀 and « guillemets » are dropped"]
+
+    rng = random.Random(0)
+    alphabet = "abcXYZ09_ <>/!?.,;:'\"()[]{}-@#\n\tÉσΣ"
+    for _ in range(500):
+        length = rng.randint(0, 40)
+        texts.append(''.join(rng.choice(alphabet) for _ in range(length)))
+
+    for lower in (True, False):
+        tokenizer = T.Tokenizer(lower=lower)
+        for text in texts:
+            assert tokenizer.preprocess(text) == referencePreprocess(text, lower), \
+                f"preprocess diverges from the reference on {text!r} (lower={lower})"
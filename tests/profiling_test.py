@@ -0,0 +1,38 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import json
+
+
+def testProfiling():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=10)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    text = ['Is the man tall?', 'Or is the man who is tall tall?']
+    gold = tokenizer.encode(text, add_special_tokens=True, padding=True, truncate=True)
+    assert tokenizer.stats() == {}
+
+    tokenizer.enable_profiling()
+    assert tokenizer.encode(text, add_special_tokens=True, padding=True,
+                            truncate=True) == gold
+    assert tokenizer('the cat') == [7, 1, 9, 8]
+
+    stats = tokenizer.stats()
+    assert stats['calls'] == 2 and stats['texts'] == 3
+    assert stats['tokens'] == 5 + 9 + 2 and stats['unk'] == 2
+    assert stats['seconds']['preprocess'] > 0 and stats['seconds']['padding'] > 0
+    assert stats['seconds']['cache'] == 0
+    json.dumps(stats)
+
+    tokenizer.reset_stats()
+    assert tokenizer.stats()['tokens'] == 0
+
+    cached = T.Tokenizer(maxSequenceLength=10, cacheSize=16)
+    cached.load_tokenizer('./tests/TestVocab.txt')
+    cached.enable_profiling()
+    assert cached.encode(text, add_special_tokens=True, padding=True,
+                         truncate=True) == gold
+    assert cached.stats()['seconds']['cache'] > 0
+
+    cached.enable_profiling(False)
+    assert cached.stats() == {}
@@ -0,0 +1,60 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+import tempfile
+
+
+def testThresholdSweep():
+
+    rng = random.Random(0)
+    words = ['the', 'man', 'is', 'tall', 'who', 'cat', 'dog', 'eats', 'food', '.',
+             '<unk>', 'rare', 'Rarer']
+    lines = [' '.join(rng.choices(words, weights=range(len(words), 0, -1), k=12))
+             for _ in range(50)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        with open(fname, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+
+        tokenizer = T.Tokenizer()
+        counts = tokenizer.count_vocab(fname)
+        assert tokenizer.counts is counts and len(tokenizer) == 0
+        total = sum(counts.values())
+
+        thresholds = [100, 0, 5, 30, 60, 1000]
+        for addSpecialTokens in (True, False):
+            report = tokenizer.threshold_sweep(thresholds, addSpecialTokens=addSpecialTokens)
+            assert [row['freqThreshold'] for row in report] == thresholds
+            for row in report:
+                gold = T.Tokenizer()
+                gold.create_vocab(fname, freqThreshold=row['freqThreshold'],
+                                  addSpecialTokens=addSpecialTokens)
+                covered = sum(count for word, count in counts.items()
+                              if count > row['freqThreshold'])
+                assert row['vocab_size'] == len(gold)
+                assert abs(row['coverage'] - covered / total) < 1e-12
+                assert abs(row['oov_rate'] - (1 - covered / total)) < 1e-12
+
+                tokenizer.build_vocab(row['freqThreshold'], addSpecialTokens=addSpecialTokens)
+                assert tokenizer.idx2word == gold.idx2word
+                assert tokenizer.word2idx == gold.word2idx
+                assert tokenizer.freqThreshold == row['freqThreshold']
+
+        # Counts saved before any vocabulary is built from them
+        tokenizer = T.Tokenizer()
+        tokenizer.count_vocab(fname)
+        vocab = os.path.join(tmp, 'vocab.txt')
+        tokenizer.save_tokenizer(vocab)
+        loaded = T.Tokenizer()
+        loaded.load_tokenizer(vocab)
+        assert loaded.freqThreshold is None and loaded.vocabVersion == 0
+        assert loaded.counts == counts
+        assert loaded.threshold_sweep([5]) == tokenizer.threshold_sweep([5])
+
+    try:
+        T.Tokenizer().threshold_sweep([1])
+        assert False, 'sweeping without counts should fail'
+    except ValueError:
+        pass
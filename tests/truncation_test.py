@@ -0,0 +1,91 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+import tempfile
+
+
+def testTruncation():
+
+    rng = random.Random(0)
+    words = ['Is', 'the', 'man', 'who', 'tall', 'cat', '?', ',', '<', 'unk', '>',
+             '</s>', 'tall man', '\n']
+    texts = ['', 'the man', '< unk >'] + \
+        [' '.join(rng.choice(words) for _ in range(rng.randint(0, 3000))) for _ in range(40)]
+
+    for truncation in T.TRUNCATION_STRATEGIES:
+        for maxSequenceLength in (0, 1, 2, 3, 7, 100):
+            tokenizer = T.Tokenizer(maxSequenceLength=maxSequenceLength, truncation=truncation)
+            tokenizer.load_tokenizer('./tests/TestVocab.txt')
+            for added in (False, True):
+                if added:
+                    tokenizer.add_tokens(['tall man'])
+                for text in texts:
+                    ids = list(tokenizer.iter_ids(text))
+                    for add_special_tokens in (False, True):
+                        budget = max(maxSequenceLength - 2 * add_special_tokens, 0)
+                        if len(ids) <= budget:
+                            kept = ids
+                        elif truncation == 'head':
+                            kept = ids[:budget]
+                        elif truncation == 'tail':
+                            kept = ids[len(ids) - budget:]
+                        else:
+                            kept = ids[:budget - budget // 2] + ids[len(ids) - budget // 2:]
+                        if add_special_tokens:
+                            kept = [tokenizer.bos_token_id] + kept + [tokenizer.eos_token_id]
+                            if maxSequenceLength < 2:
+                                kept = [tokenizer.eos_token_id]
+                        assert tokenizer.encode(text, add_special_tokens=add_special_tokens,
+                                                truncate=True) == kept, \
+                            f"{truncation} truncation to {maxSequenceLength} differs on {text[:50]!r}"
+
+    try:
+        T.Tokenizer(truncation='middle')
+        assert False, 'an unknown truncation was accepted'
+    except ValueError:
+        pass
+
+
+def testTruncationBPE():
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, 'corpus.txt')
+        with open(fname, 'w') as f:
+            f.write(' '.join('a' * n + 'b' for n in range(1, 12)) * 5 + '\n')
+        tokenizer = T.Tokenizer(maxSequenceLength=6)
+        tokenizer.create_bpe_vocab(fname, vocabSize=20)
+
+    for truncation in ('tail', 'head+tail'):
+        tokenizer.truncation = truncation
+        for length in range(200, 420):
+            # The tail is one long word, so any cut inside it would 
+            # segment it differently
+            text = 'b ' * 10 + 'a' * length + 'b'
+            ids = list(tokenizer.iter_ids(text))
+            tail = 6 if truncation == 'tail' else 3
+            kept = ids[:6 - tail] + ids[len(ids) - tail:]
+            assert tokenizer.encode(text, truncate=True) == kept, \
+                f"{truncation} truncation differs on {length} a's"
+
+
+def testTruncationSpacedAddedToken():
+
+    tokenizer = T.Tokenizer(maxSequenceLength=6)
+    tokenizer.load_tokenizer('./tests/TestVocab.txt')
+    tokenizer.add_tokens(['a a'])
+    spaced = tokenizer.word2idx['a a']
+
+    for truncation in ('tail', 'head+tail'):
+        tokenizer.truncation = truncation
+        for count in (199, 200, 201):
+            # Matching "a a" from a cut can pair the a's off differently 
+            # from matching it from the start
+            text = 'b ' + 'a ' * count
+            ids = list(tokenizer.iter_ids(text))
+            tail = 6 if truncation == 'tail' else 3
+            kept = ids[:6 - tail] + ids[len(ids) - tail:]
+            assert tokenizer.encode(text, truncate=True) == kept, \
+                f"{truncation} truncation differs on {count} a's"
+            if count == 200 and truncation == 'tail':
+                assert kept == [spaced] * 6
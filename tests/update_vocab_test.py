@@ -0,0 +1,58 @@
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import tokenizer as T
+import random
+import tempfile
+
+
+def testUpdateVocab():
+
+    rng = random.Random(0)
+    words = ['the', 'man', 'is', 'tall', 'who', 'cat', 'dog', 'eats', 'food', '.']
+    old = [' '.join(rng.choices(words[:6], k=10)) for _ in range(30)]
+    new = [' '.join(rng.choices(words, k=10)) for _ in range(30)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        def write(name, lines):
+            fname = os.path.join(tmp, name)
+            with open(fname, 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+            return fname
+        oldName, newName, allName = write('old.txt', old), write('new.txt', new), \
+            write('all.txt', old + new)
+
+        tokenizer = T.Tokenizer()
+        tokenizer.create_vocab(oldName, freqThreshold=20)
+        before = list(tokenizer.idx2word)
+        assert tokenizer.vocabVersion == 1
+
+        vocab = os.path.join(tmp, 'vocab.txt')
+        tokenizer.save_tokenizer(vocab, binary=True)
+        loaded = T.Tokenizer()
+        loaded.load_tokenizer(vocab)
+        # Counts are copied as they are if they were never read
+        copy = os.path.join(tmp, 'copy.txt')
+        loaded.save_tokenizer(copy)
+        assert loaded._counts is None
+        with open(vocab + '.counts') as f, open(copy + '.counts') as g:
+            assert f.read() == g.read()
+        assert loaded.counts == tokenizer.counts and loaded.freqThreshold == 20
+        assert loaded.vocabVersion == 1
+
+        added = loaded.update_vocab(newName)
+        assert loaded.idx2word[:len(before)] == before
+        assert added == len(loaded) - len(before) > 0
+        assert loaded.vocabVersion == 2
+
+        full = T.Tokenizer()
+        full.create_vocab(allName, freqThreshold=20)
+        assert full.counts == loaded.counts
+        assert set(full.idx2word) == set(loaded.idx2word)
+        assert loaded.encode('the dog eats') == [loaded.word2idx[word]
+                                                 for word in ['the', 'dog', 'eats']]
+
+        loaded.save_tokenizer(vocab)
+        loaded.load_tokenizer(vocab)
+        assert loaded.vocabVersion == 2 and loaded.counts == full.counts
+        assert loaded.update_vocab(newName) == 0
+        assert loaded.vocabVersion == 3
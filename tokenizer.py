@@ -1,6 +1,194 @@
+import hashlib
+import multiprocessing
+import os
 import re  # Python regular expressions (may be useful)
+import shutil
 import string  # Python string library
-from typing import Union, Dict, List, Tuple
+from bisect import bisect_right
+from collections import Counter
+from itertools import chain, filterfalse, islice, repeat
+from numbers import Integral
+from operator import countOf
+from time import perf_counter
+from typing import Union, Dict, Iterable, List, Tuple
+
+from bpe import BPE, CONTINUATION, train_bpe, word_symbols
+from cache import LRUCache
+from corpus import (EncodedCorpus, id_typecode, read_header, source_stamp,
+                    write_encoded_corpus)
+from profiling import EncodeProfiler
+from trie import TokenTrie
+from vocab import (BinaryVocab, FrozenLookup, PackedIdx2Word, is_binary_vocab,
+                   save_binary_vocab)
+
+# Pieces kept by preprocess: runs of word characters or a single
+# punctuation mark (including < and >, which make up special tokens).
+_PIECE_PATTERN = re.compile(
+    r'[\w]+|[<>!\"#$%&\'()*+,-./\\:;=?@\[\]\^\_\`\{\|\}\~\)\(]')
+
+# Spaces that preprocess drops after joining the pieces: after < or /
+# and before >, so that <unk> and </s> come out as single tokens.
+_GLUE_PATTERN = re.compile(r'(?<=[</]) | (?=>)')
+
+# Punctuation that decode_to_text reattaches: closing marks to the
+# token before, opening marks to the token after, and the marks that
+# join words (don't, well-known, and/or) to both.
+_CLOSING = frozenset('.,!?;:%)]}')
+_OPENING = frozenset('([{$')
+_JOINING = frozenset("'/-")
+
+# Marks the end of a token that attaches to the next one in the
+# strings decode_to_text joins (removed with the space after it).
+_ATTACH = '\0'
+
+# Ways of truncating (see Tokenizer.truncation).
+TRUNCATION_STRATEGIES = ('head', 'tail', 'head+tail')
+
+# Extra ids the tail of a long text is encoded with beyond the ones
+# kept, so that tokens glued across the cut (e.g., "< unk >" or an
+# added token) cannot change the ids that are kept.
+_TAIL_MARGIN = 16
+
+_SPACE = re.compile(r'\s')
+
+# Characters _PIECE_PATTERN skips, and the patterns _count_pieces uses
+# to find where preprocess glues pieces: a < or / followed (past any
+# skipped characters) by >, a > before any other piece, and a < or /
+# after every other piece.
+_SKIPPED = r'[^\w<>!"#$%&\'()*+,\-./\\:;=?@\[\]^`{|}~]'
+_GLUED_PAIR = re.compile(r'[</](?=%s*>)' % _SKIPPED)
+_LEADING_CLOSE = re.compile(r'%s*>' % _SKIPPED)
+_TRAILING_OPEN = re.compile(r'[</]%s*\Z' % _SKIPPED)
+
+# Marks a cache miss (None is a valid cached value).
+_MISSING = object()
+
+
+def _iter_pieces(text: str):
+    """
+    Yields the tokens preprocess would produce for text, without
+    lowercasing them and without building the preprocessed string.
+    Pieces are glued together exactly where preprocess drops the space
+    (after < or / and before >).
+    """
+    token = ''
+    for match in _PIECE_PATTERN.finditer(text):
+        piece = match.group()
+        if token and (piece == '>' or token[-1] in '</'):
+            token += piece
+            continue
+        if token:
+            yield token
+        token = piece
+    if token:
+        yield token
+
+
+def _count_pieces(text: str) -> int:
+    """
+    Returns how many tokens preprocess would split text into, without 
+    building them: the number of pieces, less one for each place two 
+    pieces are glued (after < or / and before >, see _iter_pieces).
+    """
+    # subn only builds the string of skipped characters, not the pieces
+    numPieces = _PIECE_PATTERN.subn('', text)[1]
+    if '<' not in text and '>' not in text and '/' not in text:
+        return numPieces
+    # Each < or / glues to the piece after it (if any), each > to the 
+    # piece before it (if any), and a < or / right before a > was 
+    # counted twice
+    glued = (text.count('<') + text.count('/') + text.count('>')
+             - len(_GLUED_PAIR.findall(text)))
+    if _LEADING_CLOSE.match(text):
+        glued -= 1
+    if _TRAILING_OPEN.search(text):
+        glued -= 1
+    return numPieces - glued
+
+
+def _pad_rows(rows: List[List[int]], pad: int):
+    """
+    Right pads each row in place to the length of the longest row,
+    with one extend per row.
+    """
+    if not rows:
+        return
+    highest = max(map(len, rows))
+    for row in rows:
+        row.extend([pad] * (highest - len(row)))
+
+
+def _prune_counts(counts: Counter, keep: int):
+    """
+    Drops entries from counts in place so that keep remain: the most 
+    frequent ones, with ties at the cut-off count broken in favour of 
+    the entries counted first. 
+    """
+    if len(counts) <= keep:
+        return
+    cut = sorted(counts.values(), reverse=True)[keep - 1]
+    room = keep - sum(1 for count in counts.values() if count > cut)
+    dropped = []
+    for word, count in counts.items():
+        if count < cut:
+            dropped.append(word)
+        elif count == cut:
+            if room > 0:
+                room -= 1
+            else:
+                dropped.append(word)
+    for word in dropped:
+        del counts[word]
+
+
+def _line_aligned_ranges(fname: str, parts: int) -> List[Tuple[int, int]]:
+    """
+    Splits the file fname into at most parts non-empty byte ranges 
+    (start, end) of about equal size, each starting at a line start.
+    """
+    size = os.path.getsize(fname)
+    bounds = [0]
+    with open(fname, 'rb') as f:
+        for k in range(1, parts):
+            pos = size * k // parts
+            if pos <= bounds[-1]:
+                continue
+            f.seek(pos - 1)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def _count_range(args) -> Counter:
+    """
+    Counts the tokens in the lines of a byte range of a file,
+    in a worker process (see Tokenizer._count_file_parallel).
+    """
+    tokenizer, fname, start, end, maxEntries = args
+
+    def lines(f):
+        pos = start
+        while pos < end:
+            line = f.readline()
+            if not line:
+                return
+            pos += len(line)
+            yield line.decode('utf-8')
+
+    with open(fname, 'rb') as f:
+        f.seek(start)
+        return tokenizer._count_words(lines(f), maxEntries)
+
+
+def _merge_counts(pair: List[Counter]) -> Counter:
+    """
+    Merges the second of two partial counts (if any) into the first.
+    """
+    counts = pair[0]
+    for other in pair[1:]:
+        counts.update(other)
+    return counts
 
 
 class Tokenizer:
@@ -37,6 +225,39 @@ class Tokenizer:
         truncate (bool): Whether to right truncate when sequence length
                          is greater than maxSequenceLength when __call__.
                          Default is True.
+        truncation (str): Which ids truncation keeps: "head" (the first 
+                          ones, i.e., truncate from the right), "tail" 
+                          (the last ones) or "head+tail" (the first half 
+                          and the last half). Default is "head".
+
+        cache (LRUCache): Optional cache of raw whitespace-delimited chunks 
+                          to ids used by encode, holding up to cacheSize 
+                          chunks. It is cleared whenever the vocabulary 
+                          (or lower) changes. Default is None (cacheSize=0).
+        textCache (LRUCache): Optional cache of whole texts to ids used by 
+                              encode_batch across calls, holding up to 
+                              textCacheSize texts. Texts are keyed by a 
+                              hash of their content, so the texts 
+                              themselves are not kept. It is cleared 
+                              whenever the vocabulary (or any setting 
+                              that changes the ids) changes. Default is 
+                              None (textCacheSize=0).
+        profiler (EncodeProfiler): Per-stage timers and counters of encode,
+                                   when on (see enable_profiling). 
+                                   Default is None.
+        addedTokens (TokenTrie): Tokens registered with add_tokens, which 
+                                 are split out of the text whole before 
+                                 preprocessing. Empty by default.
+        bpe (BPE): Merges used to split words into subwords in BPE mode 
+                   (see create_bpe_vocab). Default is None (word level).
+        counts (Counter): Frequency of every word counted by create_vocab 
+                          and update_vocab, so the vocabulary can be 
+                          updated from new data. Counts saved with the 
+                          vocabulary are only read from disk when first 
+                          used. Default is None.
+        freqThreshold (int): The threshold the vocabulary was built with.
+        vocabVersion (int): Number of times the vocabulary was built or 
+                            updated from data. Default is 0.
 
     """
 
@@ -50,6 +271,9 @@ class Tokenizer:
                  lower=True,
                  padding=True,
                  truncate=True,
+                 cacheSize=0,
+                 truncation='head',
+                 textCacheSize=0,
                  ):
 
         self.word2idx = dict()
@@ -66,6 +290,19 @@ class Tokenizer:
         self.lower = lower
         self.padding = padding
         self.truncate = truncate
+        if truncation not in TRUNCATION_STRATEGIES:
+            raise ValueError(f'Unsupported truncation: {truncation!r}')
+        self.truncation = truncation
+
+        self.cache = LRUCache(cacheSize) if cacheSize else None
+        self.textCache = LRUCache(textCacheSize) if textCacheSize else None
+        self.profiler = None
+        self.addedTokens = TokenTrie()
+        self.bpe = None
+        self.counts = None
+        self.freqThreshold = None
+        self.vocabVersion = 0
+        self._frozen = None
 
     def __len__(self):
         """
@@ -85,43 +322,68 @@ class Tokenizer:
                            padding=self.padding,
                            truncate=self.truncate)
 
+    @property
+    def counts(self) -> Counter:
+        """
+        The word counts, read from the file load_tokenizer found them in 
+        on first use (parsing them can take far longer than loading the 
+        vocabulary itself).
+        """
+        if self._countsFile is not None:
+            fname, self._countsFile = self._countsFile, None
+            counts = Counter()
+            with open(fname) as f:
+                f.readline()
+                for line in f:
+                    word, count = line.rstrip('\n').split('\t')
+                    counts[word] = int(count)
+            self._counts = counts
+        return self._counts
+
+    @counts.setter
+    def counts(self, counts: Counter):
+        self._counts = counts
+        self._countsFile = None
+
     @property
     def unk_token_id(self):
         """
         Fixes self.unk_token_id
         """
-        if self.unk_token not in self.word2idx:
-            return None
-        return self.word2idx[self.unk_token]
+        return self.word2idx.get(self.unk_token)
 
     @property
     def bos_token_id(self):
         """
         Fixes self.bos_token_id
         """
-        if self.bos_token not in self.word2idx:
-            return None
-        return self.word2idx[self.bos_token]
+        return self.word2idx.get(self.bos_token)
 
     @property
     def eos_token_id(self):
         """
         Fixes self.eos_token_id
         """
-        if self.eos_token not in self.word2idx:
-            return None
-        return self.word2idx[self.eos_token]
+        return self.word2idx.get(self.eos_token)
 
     @property
     def pad_token_id(self):
         """
         Fixes self.pad_token_id
         """
-        if self.pad_token not in self.word2idx:
-            return None
-        return self.word2idx[self.pad_token]
+        return self.word2idx.get(self.pad_token)
+
+    def _pad_id(self) -> int:
+        """
+        Returns the id rows are padded with, raising KeyError if the 
+        pad token is not in the vocabulary.
+        """
+        pad = self.word2idx.get(self.pad_token)
+        if pad is None:
+            raise KeyError(self.pad_token)
+        return pad
 
-    def save_tokenizer(self, outname: str):
+    def save_tokenizer(self, outname: str, binary: bool = False):
         """
         Save the tokenizer to a plain txt file named outname. 
         Format the file such that each line has one token and 
@@ -132,10 +394,48 @@ class Tokenizer:
             outname should contain:
             the
             cat
+
+        With binary=True, the vocabulary is instead saved in the 
+        binary format of vocab.py (token offsets, a string blob and a 
+        prebuilt hash index), which load_tokenizer can mmap without 
+        parsing.
+
+        In BPE mode (see create_bpe_vocab), the merges are also saved, 
+        to outname + ".merges". The word counts kept by create_vocab and 
+        update_vocab, with the threshold and version, are saved to 
+        outname + ".counts" (one "word<TAB>count" per line, after a 
+        "#version <n> freqThreshold <t>" line, where t is None if no 
+        vocabulary was built from the counts).
         """
-        with open(outname, 'w') as f:
-            for word in self.idx2word:
-                f.write(word+'\n')
+        if binary:
+            save_binary_vocab(outname, self.idx2word)
+        else:
+            with open(outname, 'w') as f:
+                for word in self.idx2word:
+                    f.write(word+'\n')
+
+        merges = outname + '.merges'
+        if self.bpe is not None:
+            self.bpe.save(merges)
+        elif os.path.exists(merges):
+            os.remove(merges)
+
+        counts = outname + '.counts'
+        if self._countsFile is not None:
+            # Copy counts that were never read, without parsing them
+            tmpname = f'{counts}.{os.getpid()}.tmp'
+            with open(self._countsFile) as f, open(tmpname, 'w') as out:
+                f.readline()
+                out.write(f'#version {self.vocabVersion} freqThreshold {self.freqThreshold}\n')
+                shutil.copyfileobj(f, out)
+            os.replace(tmpname, counts)
+            self._countsFile = counts
+        elif self._counts is not None:
+            with open(counts, 'w') as f:
+                f.write(f'#version {self.vocabVersion} freqThreshold {self.freqThreshold}\n')
+                f.writelines(f'{word}\t{count}\n' for word, count in self._counts.items())
+        elif os.path.exists(counts):
+            os.remove(counts)
 
     def load_tokenizer(self, vocabfname: str):
         """
@@ -162,13 +462,112 @@ class Tokenizer:
             >>> ['the', 'a', 'cat', 'loves', 'eats', 'food', '.', '!',  
             ... '<unk>', '<pad>', '<s>', '</s>']
 
+        If vocabfname was saved with save_tokenizer(..., binary=True), 
+        it is memory-mapped instead and word2idx and idx2word become 
+        read-only views of it (replacing the current vocabulary), so 
+        loading takes the same time whatever the vocabulary size.
+
+        If there is a vocabfname + ".merges" file (saved in BPE mode), 
+        the tokenizer switches to BPE mode with those merges. If there 
+        is a vocabfname + ".counts" file, the threshold and version are 
+        loaded from it, and the word counts are read from it when first 
+        used (see update_vocab).
+
         """
-        with open(vocabfname, 'r') as f:
-            for line in f:
-                line = line.strip()
-                if line not in self.word2idx:
-                    self.word2idx[line] = len(self.idx2word)
-                    self.idx2word.append(line)
+        if is_binary_vocab(vocabfname):
+            vocab = BinaryVocab(vocabfname)
+            self.word2idx = vocab.word2idx
+            self.idx2word = vocab.idx2word
+        else:
+            self._mutable_vocab()
+            with open(vocabfname, 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line not in self.word2idx:
+                        self.word2idx[line] = len(self.idx2word)
+                        self.idx2word.append(line)
+
+        merges = vocabfname + '.merges'
+        self.bpe = BPE.load(merges) if os.path.exists(merges) else None
+        self._load_counts(vocabfname + '.counts')
+        self._vocab_changed()
+
+    def _load_counts(self, fname: str):
+        """
+        Loads the threshold and version saved by save_tokenizer to 
+        fname, leaving the word counts to be read when first used 
+        (see counts), or clears them if there is no fname.
+        """
+        self.counts = None
+        self.freqThreshold = None
+        self.vocabVersion = 0
+        if not os.path.exists(fname):
+            return
+        with open(fname) as f:
+            _, version, _, threshold = f.readline().split()
+        self._countsFile = fname
+        # None if the words were counted but no vocabulary built from them
+        self.freqThreshold = None if threshold == 'None' else int(threshold)
+        self.vocabVersion = int(version)
+
+    def _mutable_vocab(self):
+        """
+        Copies a read-only word2idx or idx2word (e.g., from a binary 
+        vocabulary) into a dict and list, so that tokens can be added.
+        """
+        if type(self.word2idx) != dict or type(self.idx2word) != list:
+            self.word2idx = dict(self.word2idx)
+            self.idx2word = list(self.idx2word)
+
+    def _vocab_changed(self):
+        """
+        Drops anything derived from the vocabulary (e.g., the chunk 
+        cache). Called whenever load_tokenizer or create_vocab change it.
+        """
+        self._frozen = None
+        for cache in (self.cache, self.textCache):
+            if cache is not None:
+                cache.clear()
+                cache.owner = None
+
+    def _lookup(self) -> FrozenLookup:
+        """
+        Returns the FrozenLookup of the current vocabulary, building it 
+        on first use after the vocabulary or special tokens change. 
+        Tokens added to or removed from word2idx in place are noticed by 
+        its size; ids changed in place need _vocab_changed.
+        """
+        frozen = self._frozen
+        if (frozen is not None and frozen.word2idx is self.word2idx
+                and frozen.size == len(self.word2idx)
+                and frozen.unk is self.unk_token and frozen.bos is self.bos_token
+                and frozen.eos is self.eos_token and frozen.pad is self.pad_token):
+            return frozen
+        frozen = self._frozen = FrozenLookup(self.word2idx, self.unk_token,
+                                             self.bos_token, self.eos_token,
+                                             self.pad_token)
+        return frozen
+
+    def pack_idx2word(self, cacheSize: int = 0):
+        """
+        Replace idx2word with a read-only PackedIdx2Word (see vocab.py), 
+        which keeps all tokens in one UTF-8 buffer and decodes them 
+        when indexed, optionally keeping the cacheSize most recently 
+        used tokens. This saves the Python str object per token of a 
+        list, which matters for large vocabularies that are mostly used 
+        for decode. An idx2word that is already packed (e.g., after 
+        loading a binary vocabulary) is kept as is, with its cache 
+        resized.
+
+        Args:
+            cacheSize (int): Number of decoded tokens to cache. 
+                             Default is 0 (no cache).
+        """
+        if isinstance(self.idx2word, PackedIdx2Word):
+            self.idx2word.cacheSize = cacheSize
+            self.idx2word._cache.clear()
+        else:
+            self.idx2word = PackedIdx2Word.from_tokens(self.idx2word, cacheSize)
 
     def preprocess(self, text: str) -> str:
         """
@@ -209,19 +608,11 @@ class Tokenizer:
             >>> text.translate(str.maketrans(table))
             >>> 'CD ABC EF'
         """
-        toRet = ""
-        newS = re.findall(r'[\w]+|[<>!\"#$%&\'()*+,-./\\:;=?@\[\]\^\_\`\{\|\}\~\)\(]', text)
-        for word in newS:
-            if self.lower:
-                word = word.lower()
-            if (re.search(r'[</]',word)):
-                toRet += word
-            elif (re.search(r'>', word)):
-                toRet = toRet.rstrip()
-                toRet += word + " "
-            else: 
-                toRet += word + " "
-        return toRet.strip()
+        text = ' '.join(_PIECE_PATTERN.findall(text))
+        text = _GLUE_PATTERN.sub('', text)
+        if self.lower:
+            text = text.lower()
+        return text
 
     def tokenize(self, text: str) -> List[str]:
         """
@@ -258,6 +649,11 @@ class Tokenizer:
             >>> tokenizer.word_tokenize("the man, who is tall, is happy!")
             >>> ["the", "man", ",", "who", "is", "tall", ",", "is", "happy", "!"]
         """
+        if self.bpe is not None:
+            return [piece for token in self._iter_tokens(text)
+                    for piece in self._subwords(token)]
+        if self.addedTokens:
+            return list(self._iter_tokens(text))
         return self.tokenize(self.preprocess(text))
 
     def convert_tokens_to_ids(self,
@@ -287,21 +683,51 @@ class Tokenizer:
             Use self.word2idx
 
         """
-        unknown = self.word2idx['<unk>']
-        keys = self.word2idx.keys()
-        tokenIDs = []
+        frozen = self._lookup()
+        unknown = frozen.unk_id
+        if unknown is None:
+            raise KeyError(self.unk_token)
         if (type(tokens) == str):
-            if (tokens in keys):
-                return [self.word2idx[tokens]]
-            else:
-                return unknown
-        else:
-            for token in tokens:
-                if (token in keys):
-                    tokenIDs.append(self.word2idx[token])
-                else:
-                    tokenIDs.append(unknown)
-        return tokenIDs
+            tokenID = frozen.get(tokens)
+            return unknown if tokenID is None else [tokenID]
+        return list(map(frozen.get, tokens, repeat(unknown)))
+
+    def convert_tokens_to_ids_batch(self, batch: List[List[str]],
+                                    add_special_tokens: bool = False) -> List[List[int]]:
+        """
+        Takes a batch of token lists (e.g., outputs of word_tokenize) and 
+        returns the ids of each list, as convert_tokens_to_ids does for 
+        one list. The vocabulary lookup and the special token ids are 
+        resolved once for the whole batch, and each list is converted 
+        in a single map over the bound lookup.
+
+        Args:
+            batch (List[List[str]]): Lists of tokens to be converted to ids.
+            add_special_tokens (bool): Whether to add bos and eos ids 
+                                       around each list. Default is False.
+
+        Returns:
+            List[List[int]]: The ids of the tokens of each list.
+
+        For example, 
+            assuming that self.word2idx = {'the': 0, 'cat': 1, '<unk>': 2,
+                                           '<s>': 3, '</s>': 4}
+            >>> tokenizer.convert_tokens_to_ids_batch([["the", "cat"], ["dog"]])
+            >>> [[0, 1], [2]]
+            >>> tokenizer.convert_tokens_to_ids_batch([["the", "cat"]], 
+            ...                                       add_special_tokens=True)
+            >>> [[3, 0, 1, 4]]
+        """
+        frozen = self._lookup()
+        get = frozen.get
+        unknown = frozen.unk_id
+        if unknown is None:
+            raise KeyError(self.unk_token)
+        unknown = repeat(unknown)
+        if not add_special_tokens:
+            return [list(map(get, tokens, unknown)) for tokens in batch]
+        bos, eos = [frozen.bos_id], [frozen.eos_id]
+        return [bos + list(map(get, tokens, unknown)) + eos for tokens in batch]
 
     
     def encode(self, text: Union[str, List[str]],
@@ -321,7 +747,7 @@ class Tokenizer:
             padding (bool): Whether to pad to the maximum length 
                             in the batch. Default is False.
             truncate (bool): Whether to truncate input if it exceeds 
-                             maxSequenceLength (truncate from the right). 
+                             maxSequenceLength (see self.truncation). 
                              Default is False.
 
         Returns:
@@ -356,59 +782,770 @@ class Tokenizer:
 
             Notice the ordering of pad, truncate, and the special tokens
         """
-        preProcessedText = ""
-        Bos = self.convert_tokens_to_ids("<s>")[0]
-        Eos = self.convert_tokens_to_ids("</s>")[0]
-        pad = self.convert_tokens_to_ids("<pad>")[0]
-        toRetBatch = []
-        toRet = []
-        highest = 0
-        tokenizedID = 0
-        
+        if self.profiler is not None:
+            self.profiler.calls += 1
         if (type(text) == str):
-            preProcessedText = self.preprocess(text)
-            for word in preProcessedText.split():
-                tokenizedID = self.convert_tokens_to_ids(word)  
-                if (type(tokenizedID) == list):
-                    toRet.extend(tokenizedID)
+            return self.encode_fast(text,
+                                    add_special_tokens=add_special_tokens,
+                                    truncate=truncate)
+        elif (type(text) == list):
+            return self.encode_batch(text,
+                                     add_special_tokens=add_special_tokens,
+                                     padding=padding,
+                                     truncate=truncate)
+
+    def iter_ids(self, text: str):
+        """
+        Lazily yields the ids of the tokens in text. This fuses
+        preprocess, tokenize and convert_tokens_to_ids into one pass
+        over the regex matches, so neither the preprocessed string nor
+        the list of tokens is ever built. No special tokens are added.
+
+        Args:
+            text (str): Input text.
+
+        Yields:
+            int: The id of each token (the unk token id if not in vocab).
+
+        For example,
+            assuming word2idx = {'the':0, 'cat':1, '<unk>':2}
+            >>> list(tokenizer.iter_ids("The cat sleeps"))
+            >>> [0, 1, 2]
+        """
+        frozen = self._lookup()
+        lookup = frozen.get
+        unknown = frozen.unk_id
+        if unknown is None:
+            raise KeyError(self.unk_token)
+        if self.bpe is not None:
+            for token in self._iter_tokens(text):
+                for piece in self._subwords(token):
+                    yield lookup(piece, unknown)
+        elif self.addedTokens:
+            for token in self._iter_tokens(text):
+                yield lookup(token, unknown)
+        elif self.lower:
+            for token in _iter_pieces(text):
+                yield lookup(token.lower(), unknown)
+        else:
+            for token in _iter_pieces(text):
+                yield lookup(token, unknown)
+
+    def _cached_ids(self, text: str) -> List[int]:
+        """
+        Returns the ids of text by looking up each whitespace-delimited 
+        chunk in self.cache, running iter_ids only on chunks not seen 
+        before. A chunk whose first piece is > or whose last piece is 
+        < or / can glue onto its neighbours (see preprocess), so it is 
+        cached as None and the whole text falls back to iter_ids. The 
+        cache is cleared if the lookup (see _lookup) or lower changed.
+        """
+        cache = self.cache
+        frozen = self._lookup()
+        if cache.owner is None or cache.owner[0] is not frozen or cache.owner[1] != self.lower:
+            cache.clear()
+            cache.owner = (frozen, self.lower)
+
+        ids = []
+        for chunk in text.split():
+            chunkIds = cache.get(chunk, _MISSING)
+            if chunkIds is _MISSING:
+                pieces = _PIECE_PATTERN.findall(chunk)
+                if pieces and (pieces[0] == '>' or pieces[-1] in ('<', '/')):
+                    chunkIds = None
                 else:
-                    toRet.append(tokenizedID)
-            if (add_special_tokens):
-                toRet.insert(0, Bos)
-                toRet.insert(len(toRet), Eos)
-            if (truncate):
-                while (len(toRet) > self.maxSequenceLength):
-                    toRet.pop()
-                if (add_special_tokens):
-                    toRet.pop()
-                    toRet.append(Eos)
+                    chunkIds = tuple(self.iter_ids(chunk))
+                cache.put(chunk, chunkIds)
+            if chunkIds is None:
+                return list(self.iter_ids(text))
+            ids.extend(chunkIds)
+        return ids
+
+    def vocab_fingerprint(self) -> bytes:
+        """
+        Returns a 16-byte hash of everything that decides which ids a 
+        text encodes to: the tokens in id order, the added tokens, the 
+        BPE merges (if any), lowercasing and the special tokens (bos and 
+        eos ids are added around texts, and pad ids pad them). It 
+        changes whenever word2idx does, so files of ids can be checked 
+        against it (see encode_corpus_to_file).
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f'{self.lower}\n{self.unk_token}\n{self.bos_token}\n'
+                 f'{self.eos_token}\n{self.pad_token}\n'.encode('utf-8'))
+        for token in self.idx2word:
+            h.update(token.encode('utf-8') + b'\n')
+        h.update(b'\0')
+        for token in sorted(self.addedTokens.tokens):
+            h.update(token.encode('utf-8') + b'\n')
+        h.update(b'\0')
+        if self.bpe is not None:
+            for first, second in self.bpe.merges:
+                h.update(f'{first} {second}\n'.encode('utf-8'))
+        return h.digest()
+
+    def cache_info(self) -> Dict[str, int]:
+        """
+        Returns the hits, misses, size and maxsize of the chunk cache 
+        used by encode (all 0 if it is disabled).
+        """
+        if self.cache is None:
+            return {'hits': 0, 'misses': 0, 'size': 0, 'maxsize': 0}
+        return self.cache.info()
+
+    def _iter_tokens(self, text: str):
+        """
+        Yields the tokens of text: each added token (see add_tokens) as 
+        is, and the text around them as split by preprocess.
+        """
+        for isAdded, segment in self.addedTokens.split(text):
+            if isAdded:
+                yield segment
+            elif self.lower:
+                for token in _iter_pieces(segment):
+                    yield token.lower()
+            else:
+                yield from _iter_pieces(segment)
+
+    def _subwords(self, token: str) -> List[str]:
+        """
+        Returns the BPE subwords of token; special and added tokens are 
+        kept whole.
+        """
+        if (token in self.addedTokens or token == self.unk_token
+                or token == self.bos_token or token == self.eos_token
+                or token == self.pad_token):
+            return [token]
+        return self.bpe.segment(token)
+
+    def add_tokens(self, tokens: List[str]) -> int:
+        """
+        Register added tokens, which are split out of the raw text 
+        before preprocessing and always encoded as one token, even if 
+        they contain spaces or punctuation (e.g., "new york" or 
+        "<sep>"). They are matched exactly (ignoring lower), longest 
+        first, by a trie (see trie.py), so thousands of them cost about 
+        the same as a few. Tokens not yet in the vocabulary are added 
+        to the end of it. The first call also registers the unk, bos, 
+        eos and pad tokens, so that these are always split out whole.
+
+        Args:
+            tokens (List[str]): Tokens to add.
+
+        Returns:
+            int: Number of tokens added to the vocabulary.
+
+        For example, 
+            assuming word2idx = {'the':0, 'cat':1, '<unk>':2}
+            >>> tokenizer.add_tokens(['new york', '<sep>'])
+            >>> 2
+            >>> tokenizer.encode("the cat<sep>New york new york")
+            >>> [0, 1, 4, 2, 2, 3]
+        """
+        if not self.addedTokens:
+            for token in (self.unk_token, self.bos_token,
+                          self.eos_token, self.pad_token):
+                self.addedTokens.add(token)
+
+        self._mutable_vocab()
+        added = 0
+        for token in tokens:
+            self.addedTokens.add(token)
+            if token not in self.word2idx:
+                self.word2idx[token] = len(self.idx2word)
+                self.idx2word.append(token)
+                added += 1
+        self._vocab_changed()
+        return added
+
+    def encode_fast(self, text: str,
+                    add_special_tokens: bool = False,
+                    truncate: bool = False) -> List[int]:
+        """
+        Encode a single text, via iter_ids (or the chunk cache, if 
+        enabled). This is what encode does for a single text.
+
+        Args:
+            text (str): Input text.
+            add_special_tokens (bool): Whether to add eos and bos to text.
+                                       Default is False
+            truncate (bool): Whether to truncate input if it exceeds 
+                             maxSequenceLength (see self.truncation). 
+                             Default is False.
+
+        Returns:
+            List[int]: The encoding of the text by the tokenizer.
+
+        With truncate=True, only as much of a long text is encoded as 
+        the kept ids need: the head is read lazily and reading stops 
+        once enough ids are produced, and the tail is encoded from a 
+        suffix of the text, grown until it yields enough ids. So the 
+        time taken depends on maxSequenceLength, not on the length of 
+        the text.
+        """
+        if self.profiler is not None:
+            return self._encode_profiled(text, add_special_tokens, truncate)
+        if truncate:
+            budget = self._budget(add_special_tokens)
+            # No token is shorter than a character, so only a text 
+            # longer than budget can have more than budget ids
+            if len(text) > budget:
+                return self._finish(self._truncated_ids(text, budget),
+                                    add_special_tokens, truncate)
+        return self._finish(self._ids(text), add_special_tokens, truncate)
+
+    def _encode_profiled(self, text: str,
+                         add_special_tokens: bool,
+                         truncate: bool) -> List[int]:
+        """
+        encode_fast with each stage timed and counted in self.profiler. 
+        Without the cache, this runs the unfused preprocess, split and 
+        lookup steps (which give the same ids as iter_ids) so that each 
+        can be timed on its own.
+        """
+        profiler = self.profiler
+        seconds = profiler.seconds
+        frozen = self._lookup()
+        unknown = frozen.unk_id
+        if unknown is None:
+            raise KeyError(self.unk_token)
+
+        start = perf_counter()
+        if self.cache is not None:
+            ids = self._ids(text)
+            end = perf_counter()
+            seconds['cache'] += end - start
+        elif self.addedTokens or self.bpe is not None:
+            tokens = self.word_tokenize(text)
+            lookup = perf_counter()
+            seconds['preprocess'] += lookup - start
+            ids = frozen.ids(tokens)
+            end = perf_counter()
+            seconds['lookup'] += end - lookup
+        else:
+            preprocessed = self.preprocess(text)
+            split = perf_counter()
+            seconds['preprocess'] += split - start
+            tokens = preprocessed.split()
+            lookup = perf_counter()
+            seconds['split'] += lookup - split
+            ids = frozen.ids(tokens)
+            end = perf_counter()
+            seconds['lookup'] += end - lookup
+
+        profiler.texts += 1
+        profiler.tokens += len(ids)
+        profiler.unk += ids.count(unknown)
+
+        toRet = self._finish(ids, add_special_tokens, truncate)
+        seconds['finish'] += perf_counter() - end
+        return toRet
+
+    def enable_profiling(self, enabled: bool = True):
+        """
+        Turn on (or off) the per-stage timers and counters of encode 
+        (see profiling.py). Turning it on starts from zero; when off, 
+        encode pays only for one attribute check.
+
+        Args:
+            enabled (bool): Whether to profile. Default is True.
+        """
+        self.profiler = EncodeProfiler() if enabled else None
+
+    def stats(self) -> Dict:
+        """
+        Returns the profiling timers and counters as a dict, e.g.,
+            {'seconds': {'preprocess': 0.8, 'split': 0.1, 'lookup': 0.4, 
+                         'cache': 0.0, 'finish': 0.02, 'padding': 0.01},
+             'calls': 10, 'texts': 640, 'tokens': 81234, 'unk': 512}
+        or an empty dict if profiling is off.
+        """
+        if self.profiler is None:
+            return {}
+        return self.profiler.as_dict()
+
+    def reset_stats(self):
+        """
+        Zeroes the profiling timers and counters (if profiling is on).
+        """
+        if self.profiler is not None:
+            self.profiler.reset()
+
+    def _ids(self, text: str):
+        """
+        Returns the ids of text (an iterable), through the chunk cache 
+        if it is enabled.
+        """
+        if self.cache is None:
+            return self.iter_ids(text)
+        if not self.addedTokens:
+            return self._cached_ids(text)
+        ids = []
+        for isAdded, segment in self.addedTokens.split(text):
+            if isAdded:
+                ids.append(self.word2idx.get(segment, self.unk_token_id))
+            else:
+                ids.extend(self._cached_ids(segment))
+        return ids
+
+    def _budget(self, add_special_tokens: bool) -> int:
+        """
+        Returns how many ids of a text truncation keeps (maxSequenceLength, 
+        less the bos and eos ids if they are added).
+        """
+        return max(self.maxSequenceLength - (2 if add_special_tokens else 0), 0)
+
+    def _truncate(self, ids, budget: int) -> List[int]:
+        """
+        Returns the ids (an iterable) that truncation to budget ids 
+        keeps, according to self.truncation.
+        """
+        if self.truncation == 'head':
+            return list(islice(ids, budget))
+        ids = list(ids)
+        if len(ids) <= budget:
+            return ids
+        tail = budget // 2 if self.truncation == 'head+tail' else budget
+        return ids[:budget - tail] + ids[len(ids) - tail:]
+
+    def _truncated_ids(self, text: str, budget: int) -> List[int]:
+        """
+        Returns the ids of text truncated to budget ids, encoding only 
+        as much of text as needed (see encode_fast).
+        """
+        ids = self.iter_ids(text)
+        if self.truncation == 'head':
+            return list(islice(ids, budget))
+        if self.truncation == 'head+tail':
+            head = list(islice(ids, budget + 1))
+            if len(head) <= budget:
+                return head
+            tail = budget // 2
+            return head[:budget - tail] + (self._tail_ids(text, tail) if tail else [])
+        return self._tail_ids(text, budget) if budget else []
+
+    def _tail_ids(self, text: str, count: int) -> List[int]:
+        """
+        Returns the last count (at least 1) ids of text, encoding a 
+        suffix of text that starts at whitespace and is long enough to 
+        give _TAIL_MARGIN more ids than that. If an added token contains 
+        whitespace, matching it from a cut can fall out of step with 
+        matching it from the start for the rest of the text, so the 
+        whole text is encoded instead.
+        """
+        if self.addedTokens.spaced:
+            return list(self.iter_ids(text))[-count:]
+        size = 8 * (count + _TAIL_MARGIN)
+        while size < len(text):
+            # A suffix that starts inside a word could split it (or an 
+            # added token) differently, so only whitespace is a cut
+            space = _SPACE.search(text, len(text) - size)
+            if space is not None:
+                ids = list(self.iter_ids(text[space.start():]))
+                if len(ids) >= count + _TAIL_MARGIN:
+                    return ids[-count:]
+            size *= 4
+        return list(self.iter_ids(text))[-count:]
+
+    def _finish(self, ids, add_special_tokens: bool, truncate: bool) -> List[int]:
+        """
+        Truncates ids (an iterable) to maxSequenceLength (if specified, 
+        see self.truncation), and then adds the bos and eos ids (if 
+        specified) around them.
+        """
+        if truncate:
+            if add_special_tokens and self.maxSequenceLength < 2:
+                # There is only room for eos, which is always kept last
+                return [self._lookup().eos_id]
+            ids = self._truncate(ids, self._budget(add_special_tokens))
+        if add_special_tokens:
+            frozen = self._lookup()
+            toRet = [frozen.bos_id]
+            toRet.extend(ids)
+            toRet.append(frozen.eos_id)
             return toRet
-        elif (type(text) == list):
-            for string in text:
-                preProcessedText = self.preprocess(string)
-                toRet = []
-                highest = max(len(preProcessedText.split()),highest)
-                for word in preProcessedText.split():
-                    word = self.preprocess(word)
-                    tokenizedID = self.convert_tokens_to_ids(word)
-                    if (type(tokenizedID) == list):
-                        toRet.extend(tokenizedID)
-                    else:
-                        toRet.append(tokenizedID)
-                toRetBatch.append(toRet)
-            if (add_special_tokens):
-                toRet.insert(0, Bos)
-                toRet.insert(-1, Eos)
-            if (padding):
-                for batch in toRetBatch:
-                    while len(batch) < highest:
-                        batch.append(pad)
-            if (truncate):
-                for batch in toRetBatch:
-                    while len(batch) > self.maxSequenceLength:
-                        batch.pop()
-                    batch.insert(len(batch), Eos)
-            return toRetBatch
+        return list(ids)
+
+    def count_tokens(self, text: Union[str, List[str]],
+                     add_special_tokens: bool = False,
+                     return_unk: bool = False):
+        """
+        Returns how many ids encode would give for text (or for each 
+        text of a batch), without building the ids or, in the common 
+        case, the tokens: the pieces preprocess would split text into 
+        are counted where they are matched. Only with return_unk are 
+        the tokens looked up, one at a time.
+
+        Args:
+            text (str, List[str]): Input text or batch of texts.
+            add_special_tokens (bool): Whether to count eos and bos.
+                                       Default is False
+            return_unk (bool): Whether to also return how many of the 
+                               ids are the unk token id. Default is False.
+
+        Returns:
+            int | Tuple[int, int] | List: The number of ids, or with 
+                return_unk the number of ids and the number of unk ids, 
+                or a list of these for a batch.
+
+        For example,
+            assuming word2idx = {'the':0, 'cat':1, '<unk>':2, '<s>':3, '</s>':4}
+            >>> tokenizer.count_tokens("The cat sleeps")
+            >>> 3
+            >>> tokenizer.count_tokens("The cat sleeps", add_special_tokens=True, 
+            ...                        return_unk=True)
+            >>> (5, 1)
+            >>> tokenizer.count_tokens(['the cat', 'the'])
+            >>> [2, 1]
+        """
+        if type(text) == list:
+            return self.count_tokens_batch(text, add_special_tokens=add_special_tokens,
+                                           return_unk=return_unk)
+        special = 2 if add_special_tokens else 0
+        if return_unk:
+            numIds, numUnk = self._count_unk(text, self._unk_id())
+            return numIds + special, numUnk
+        return self._count(text) + special
+
+    def count_tokens_batch(self, texts: List[str],
+                           add_special_tokens: bool = False,
+                           return_unk: bool = False) -> List:
+        """
+        Returns count_tokens of each text in texts.
+        """
+        special = 2 if add_special_tokens else 0
+        count = self._count
+        if not return_unk:
+            return [count(text) + special for text in texts]
+        rows = map(self._count_unk, texts, repeat(self._unk_id()))
+        return [(numIds + special, numUnk) for numIds, numUnk in rows]
+
+    def _count(self, text: str) -> int:
+        """
+        Returns the number of tokens (BPE subwords included) in text.
+        """
+        if self.bpe is not None:
+            subwords = self._subwords
+            return sum(len(subwords(token)) for token in self._iter_tokens(text))
+        if self.addedTokens:
+            return sum(1 if isAdded else _count_pieces(segment)
+                       for isAdded, segment in self.addedTokens.split(text))
+        return _count_pieces(text)
+
+    def _count_unk(self, text: str, unknown: int) -> Tuple[int, int]:
+        """
+        Returns the number of tokens in text and how many of their ids 
+        are unknown (the unk token id). Unless pieces of text may be 
+        glued, the tokens are counted by _count and looked up straight 
+        from the regex matches, without the per-token generator step 
+        of iter_ids.
+        """
+        if (self.bpe is not None or self.addedTokens
+                or '<' in text or '>' in text or '/' in text):
+            numIds = numUnk = 0
+            for idx in self.iter_ids(text):
+                numIds += 1
+                if idx == unknown:
+                    numUnk += 1
+            return numIds, numUnk
+        tokens = map(re.Match.group, _PIECE_PATTERN.finditer(text))
+        if self.lower:
+            tokens = map(str.lower, tokens)
+        return (_count_pieces(text),
+                countOf(map(self._lookup().get, tokens, repeat(unknown)), unknown))
+
+    def _unk_id(self) -> int:
+        """
+        Returns the unk token id, raising KeyError if it is not in the 
+        vocabulary.
+        """
+        unknown = self._lookup().unk_id
+        if unknown is None:
+            raise KeyError(self.unk_token)
+        return unknown
+
+    def encode_stream(self, source: Union[str, Iterable[str]],
+                      windows: bool = False,
+                      stride: int = None,
+                      add_special_tokens: bool = False,
+                      truncate: bool = False):
+        """
+        Lazily encode a stream of texts, such as an open file (one line 
+        at a time), a socket reader or a generator, so that memory does 
+        not grow with the size of the input. 
+
+        By default, yields the encoding of each text in source, as 
+        encode would return it. With windows=True, the ids of all texts 
+        are instead treated as one sequence and cut into windows that 
+        fill maxSequenceLength (including the bos and eos ids, if 
+        added). Consecutive windows start stride ids apart, so they 
+        overlap by window length minus stride ids. Each window is then 
+        finished as encode would finish a text (special tokens, then 
+        truncation).
+
+        Args:
+            source (str | Iterable[str]): A text or an iterable of texts.
+            windows (bool): Whether to yield fixed-size windows instead 
+                            of one encoding per text. Default is False.
+            stride (int): Number of ids between the starts of two 
+                          windows. Default is the window length 
+                          (no overlap).
+            add_special_tokens (bool): Whether to add eos and bos to 
+                                       each text or window. Default is False
+            truncate (bool): Whether to truncate each text or window if 
+                             it exceeds maxSequenceLength. Default is False.
+
+        Yields:
+            List[int]: The ids of each text or window.
+
+        For example, 
+            assuming word2idx = {'the':0, 'cat':1, 'eats':2, '<pad>':3,
+                                '</s>':4, '<s>': 5}
+            and maxSequenceLength = 4
+
+            >>> list(tokenizer.encode_stream(['the cat', 'eats the cat']))
+            >>> [[0, 1], [2, 0, 1]]
+            >>> list(tokenizer.encode_stream(['the cat', 'eats the cat'], 
+            ...                              windows=True))
+            >>> [[0, 1, 2, 0], [1]]
+            >>> list(tokenizer.encode_stream(['the cat', 'eats the cat'], 
+            ...                              windows=True, stride=2, 
+            ...                              add_special_tokens=True))
+            >>> [[5, 0, 1, 4], [5, 2, 0, 4], [5, 1, 4]]
+        """
+        if type(source) == str:
+            source = (source,)
+
+        if not windows:
+            for text in source:
+                yield self._finish(self._ids(text), add_special_tokens, truncate)
+            return
+
+        length = self.maxSequenceLength - (2 if add_special_tokens else 0)
+        if length < 1:
+            raise ValueError('maxSequenceLength leaves no room for ids in a window')
+        if stride is None:
+            stride = length
+        if not 1 <= stride <= length:
+            raise ValueError(f'stride must be between 1 and {length}')
+
+        ids = chain.from_iterable(map(self._ids, source))
+        window = list(islice(ids, length))
+        first = True
+        while len(window) == length:
+            yield self._finish(window, add_special_tokens, truncate)
+            first = False
+            del window[:stride]
+            window.extend(islice(ids, stride))
+        if window and (first or len(window) > length - stride):
+            yield self._finish(window, add_special_tokens, truncate)
+
+    def encode_corpus_to_file(self, fname: str, outname: str,
+                              add_special_tokens: bool = False) -> EncodedCorpus:
+        """
+        Encode each line of the file fname once and store the ids in 
+        outname, for reading back with mmap (see load_encoded_corpus) 
+        instead of encoding the corpus again every epoch. The ids are 
+        stored as one flat uint16 array (uint32 if the vocabulary has 
+        more than 65536 tokens), followed by the offset of each line, 
+        and the file is read line by line, so memory does not grow 
+        with its size.
+
+        outname records the vocabulary fingerprint (see 
+        vocab_fingerprint) and the size and modification time of 
+        fname. If outname already exists and all of these (and 
+        add_special_tokens) still match, it is reused without encoding 
+        anything; otherwise it is rewritten.
+
+        Args:
+            fname (str): Name of file to encode.
+            outname (str): Name of file to store the ids in.
+            add_special_tokens (bool): Whether to add eos and bos to 
+                                       each line. Default is False
+
+        Returns:
+            EncodedCorpus: outname, memory-mapped.
+
+        For example, 
+        >>> corpus = tokenizer.encode_corpus_to_file('train.txt', 'train.ids')
+        >>> corpus[0].tolist()
+        >>> [12, 4, 7]
+        >>> batch = [window.tolist() for window in corpus.windows(128)]
+        """
+        fingerprint = self.vocab_fingerprint()
+        size, mtime = source_stamp(fname)
+        header = read_header(outname)
+        if header is not None and header[1:5] == (add_special_tokens, fingerprint,
+                                                   size, mtime):
+            return EncodedCorpus(outname, fingerprint)
+
+        # Written beside outname and then moved over it, so a corpus 
+        # still mapped from the old file is never truncated under it
+        tmpname = f'{outname}.{os.getpid()}.tmp'
+        try:
+            with open(fname) as f:
+                write_encoded_corpus(tmpname,
+                                     self.encode_stream(f, add_special_tokens=add_special_tokens),
+                                     id_typecode(len(self)), fingerprint,
+                                     add_special_tokens, size, mtime)
+            os.replace(tmpname, outname)
+        finally:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+        return EncodedCorpus(outname, fingerprint)
+
+    def load_encoded_corpus(self, fname: str) -> EncodedCorpus:
+        """
+        Memory-map a file written by encode_corpus_to_file. Raises 
+        ValueError if it was encoded with a different vocabulary.
+
+        Args:
+            fname (str): Name of file to load.
+
+        Returns:
+            EncodedCorpus: Read-only, zero-copy views of the ids of each 
+                line (corpus[i]) and of windows over all of them 
+                (corpus.windows(self.maxSequenceLength)).
+        """
+        return EncodedCorpus(fname, self.vocab_fingerprint())
+
+    def encode_batch(self, texts: List[str],
+                     add_special_tokens: bool = False,
+                     padding: bool = False,
+                     truncate: bool = False,
+                     return_tensors: str = None) -> Union[List[List[int]], Dict]:
+        """
+        Encode a batch of texts. Each text is encoded as by encode_fast
+        (special tokens, then truncation), and the batch is then padded 
+        on the right to its longest row (if specified). Each distinct 
+        text is encoded only once: a text repeated in the batch gets a 
+        copy of the ids of its first occurrence, and with textCache the 
+        ids of texts seen in earlier calls are reused too.
+
+        With return_tensors="np" the ids are written straight into a 
+        preallocated int32 matrix of shape (batch, max_len), which is 
+        always padded, and a dict is returned with:
+            input_ids (np.ndarray): int32 ids, padded with the pad token id
+                                    (0 if there is no pad token).
+            attention_mask (np.ndarray): int32, 1 for real ids, 0 for padding.
+            lengths (np.ndarray): int32 number of real ids in each row.
+            dedup_ratio (float): Fraction of the texts that repeated an 
+                                 earlier text of the batch.
+        Padding and truncation are done with slices and array masks, 
+        never one id at a time.
+
+        Args:
+            texts (List[str]): Batch of texts.
+            add_special_tokens (bool): Whether to add eos and bos to each text.
+                                       Default is False
+            padding (bool): Whether to pad to the maximum length 
+                            in the batch. Raises KeyError if the pad 
+                            token is not in the vocabulary. 
+                            Default is False.
+            truncate (bool): Whether to truncate input if it exceeds 
+                             maxSequenceLength (see self.truncation). 
+                             Default is False.
+            return_tensors (str): None for lists of ids or "np" for
+                                  NumPy arrays. Default is None.
+
+        Returns:
+            List[List[int]] | dict: The encodings of the batch.
+
+        For example, 
+            assuming word2idx = {'the':0, 'cat':1, 'eats':2, '<pad>':3,
+                                '</s>':4, '<s>': 5}
+
+            >>> tokenizer.encode_batch(['the cat', 'the cat eats'], padding=True)
+            >>> [[0, 1, 3], [0, 1, 2]]
+            >>> out = tokenizer.encode_batch(['the cat', 'the cat eats'], 
+            ...                              return_tensors="np")
+            >>> out['input_ids']
+            >>> array([[0, 1, 3], [0, 1, 2]], dtype=int32)
+            >>> out['attention_mask']
+            >>> array([[1, 1, 0], [1, 1, 1]], dtype=int32)
+            >>> out['lengths']
+            >>> array([2, 3], dtype=int32)
+        """
+        if return_tensors not in (None, 'np'):
+            raise ValueError(f'Unsupported return_tensors: {return_tensors!r}')
+
+        rows, numUnique = self._encode_unique(texts, add_special_tokens, truncate)
+        if self.profiler is not None:
+            self.profiler.duplicates += len(rows) - numUnique
+        if return_tensors is None:
+            if padding:
+                pad = self._pad_id()
+                if self.profiler is None:
+                    _pad_rows(rows, pad)
+                else:
+                    start = perf_counter()
+                    _pad_rows(rows, pad)
+                    self.profiler.seconds['padding'] += perf_counter() - start
+            return rows
+
+        import numpy as np
+
+        lengths = np.fromiter(map(len, rows), dtype=np.int32, count=len(rows))
+        maxLen = int(lengths.max()) if len(rows) else 0
+        pad = self.pad_token_id
+        ids = np.full((len(rows), maxLen), 0 if pad is None else pad, dtype=np.int32)
+        mask = np.arange(maxLen, dtype=np.int32) < lengths[:, None]
+        ids[mask] = np.fromiter(chain.from_iterable(rows), dtype=np.int32,
+                                count=int(lengths.sum()))
+        return {'input_ids': ids,
+                'attention_mask': mask.astype(np.int32),
+                'lengths': lengths,
+                'dedup_ratio': 1 - numUnique / len(rows) if rows else 0.0}
+
+    def _encode_unique(self, texts: List[str],
+                       add_special_tokens: bool,
+                       truncate: bool) -> Tuple[List[List[int]], int]:
+        """
+        Returns the ids of each text (as by encode_fast), encoding each 
+        distinct text once, and the number of distinct texts. Every 
+        row is its own list, so rows can be padded in place.
+        """
+        encode = self._text_cache_encoder(add_special_tokens, truncate)
+        unique = {}
+        rows = []
+        for text in texts:
+            row = unique.get(text)
+            if row is None:
+                row = unique[text] = encode(text)
+                rows.append(row)
+            else:
+                rows.append(row[:])
+        return rows, len(unique)
+
+    def _text_cache_encoder(self, add_special_tokens: bool, truncate: bool):
+        """
+        Returns a function that encodes a text as by encode_fast, 
+        through self.textCache if it is enabled. Cached ids are keyed 
+        by a 16-byte hash of the text and the options, and the cache is 
+        cleared if the vocabulary or a setting it depends on changed.
+        """
+        if self.textCache is None:
+            return lambda text: self.encode_fast(text, add_special_tokens=add_special_tokens,
+                                                 truncate=truncate)
+        cache = self.textCache
+        frozen = self._lookup()
+        settings = (self.lower, self.maxSequenceLength, self.truncation)
+        if cache.owner is None or cache.owner[0] is not frozen or cache.owner[1] != settings:
+            cache.clear()
+            cache.owner = (frozen, settings)
+        options = b'%d%d' % (add_special_tokens, truncate)
+
+        def encode(text: str) -> List[int]:
+            key = hashlib.blake2b(text.encode('utf-8', 'surrogatepass') + options,
+                                  digest_size=16).digest()
+            ids = cache.get(key)
+            if ids is None:
+                ids = self.encode_fast(text, add_special_tokens=add_special_tokens,
+                                       truncate=truncate)
+                cache.put(key, tuple(ids))
+                return ids
+            return list(ids)
+        return encode
 
     def convert_ids_to_tokens(self,
                               ids: Union[int, List[int]]) -> Union[str, List[str]]:
@@ -431,12 +1568,9 @@ class Tokenizer:
             >>> tokenizer.convert_ids_to_tokens([0, 1, 2])
             >>> ["the", "cat", "<unk>"]
         """
-        if type(ids) == int:
+        if isinstance(ids, Integral):
             return self.idx2word[ids]
-        tokens = []
-        for elem in ids:
-            tokens.append(self.idx2word[elem])
-        return tokens
+        return list(map(self.idx2word.__getitem__, ids))
 
     def decode(self,
                ids: Union[List[int], List[List[int]]]) -> Union[List[str], List[List[str]]]:
@@ -459,18 +1593,94 @@ class Tokenizer:
             >>> ids = [[0, 1, 2], [0, 0, 0]]
             >>> tokenizer.decode(ids)
             >>> [['the', 'cat', 'eats'], ['the', 'the', 'the']]
+
+        Each row is decoded through idx2word one id at a time, so with a 
+        packed idx2word (see pack_idx2word) only the tokens that occur 
+        in ids are ever decoded.
         """
-        if type(ids[0]) == int:
+        if len(ids) == 0 or isinstance(ids[0], Integral):
             return self.convert_ids_to_tokens(ids)
-        words = []
-        for i in ids:
-            words.append(self.convert_ids_to_tokens(i))
-        return words
+        return [self.convert_ids_to_tokens(row) for row in ids]
+
+    def decode_to_text(self, ids: Union[List[int], List[List[int]]],
+                       skip_special_tokens: bool = True) -> Union[str, List[str]]:
+        """
+        Takes ids (a list of ids or a batch of ids) and returns the text 
+        (or a text per row) they encode, undoing the spacing that 
+        preprocess adds: punctuation is reattached to the words around 
+        it (e.g., "man ," becomes "man," and "don ' t" becomes "don't") 
+        and, in BPE mode, subwords are joined into words. Lowercasing 
+        cannot be undone.
+
+        Each row is built with a single join of strings precomputed for 
+        each id (the token with the space before it, if any), and the 
+        special ids are skipped with a set precomputed for the 
+        vocabulary.
+
+        Args:
+            ids (List[int] | List[List[int]]): The ids as a list, batch, 
+                                               or NumPy array.
+            skip_special_tokens (bool): Whether to leave out the pad, bos 
+                                        and eos tokens. Default is True.
+
+        Returns:
+            str | List[str]: The text or the batch of texts.
+
+        For example, 
+            assuming word2idx = {'the':0, 'cat':1, ',':2, 'eats':3, '!':4,
+                                '<pad>':5, '<s>':6, '</s>':7}
+
+            >>> tokenizer.decode_to_text([6, 0, 1, 2, 3, 4, 7])
+            >>> 'the cat, eats!'
+            >>> tokenizer.decode_to_text([[0, 1, 5], [1, 3, 4]])
+            >>> ['the cat', 'cat eats!']
+        """
+        if hasattr(ids, 'tolist'):
+            ids = ids.tolist()
+        frozen = self._lookup()
+        if frozen.detokens is None:
+            frozen.detokens = self._detokens()
+        pieces = frozen.detokens.__getitem__
+        skip = frozen.special_ids.__contains__ if skip_special_tokens else None
+
+        def text(row) -> str:
+            text = ''.join(map(pieces, filterfalse(skip, row) if skip else row))
+            if _ATTACH in text:
+                text = text.replace(_ATTACH + ' ', '').replace(_ATTACH, '')
+            return text[1:] if text[:1] == ' ' else text
+
+        if len(ids) == 0 or isinstance(ids[0], Integral):
+            return text(ids)
+        return [text(row) for row in ids]
+
+    def _detokens(self) -> List[str]:
+        """
+        Returns the string decode_to_text joins for each id: the token 
+        with a space before it unless it attaches to the token before 
+        (it starts with closing or joining punctuation, as in "/or", or 
+        is a BPE subword, without its "##"), and ending in _ATTACH if it 
+        attaches to the token after.
+        """
+        detokens = []
+        subwords = self.bpe is not None
+        for token in self.idx2word:
+            before = ' '
+            if subwords and token.startswith(CONTINUATION) and len(token) > len(CONTINUATION):
+                token = token[len(CONTINUATION):]
+                before = ''
+            elif token[:1] in _CLOSING or token[:1] in _JOINING:
+                before = ''
+            if token[-1:] in _OPENING or token[-1:] in _JOINING:
+                token += _ATTACH
+            detokens.append(before + token)
+        return detokens
 
     
     def create_vocab(self, fname: str,
                      freqThreshold: int = 30,
-                     addSpecialTokens: bool = True):
+                     addSpecialTokens: bool = True,
+                     maxEntries: int = None,
+                     workers: int = 1):
         """
         Create a vocabulary for the tokenizer from a file name 
         (called fname). Only keep words that occur more than 
@@ -480,6 +1690,12 @@ class Tokenizer:
         (e.g., how should you treat "this?"). Words
         should be added both to word2idx and idx2word.  
 
+        The file is read one line at a time, so memory grows with the 
+        number of distinct words rather than the size of the file. 
+        Words get ids in order of decreasing frequency (ties in order 
+        of first occurrence), followed by any special tokens not 
+        already in the vocabulary.
+
         Args:
             fname (str): Name of file to build vocabulary from.
             freqThreshold (int): Threshold of frequency for 
@@ -487,6 +1703,20 @@ class Tokenizer:
                                  Default is 30.
             addSpecialTokens (bool): Whether to add special tokens to 
                                      the vocabulary. Default is True.
+            maxEntries (int): Maximum number of distinct words to count 
+                              at once. When exceeded, the least frequent 
+                              words counted so far are pruned to half 
+                              of maxEntries, so counts of rare words 
+                              become approximate (frequent words are 
+                              unaffected). Must be at least 2. Default 
+                              is None (no bound).
+            workers (int): Number of processes to count with. With more 
+                           than one, the file is split into byte ranges on 
+                           line boundaries, each counted by one process, 
+                           and the partial counts are merged pairwise in a 
+                           tree. The vocabulary is the same as with one 
+                           worker (as long as no pruning happens). 
+                           Default is 1.
 
         For example, suppose we have a file, called "cat.txt",
         with the following text (the specific ids can vary depending 
@@ -499,35 +1729,309 @@ class Tokenizer:
         >>> tokenizer = Tokenizer()
         >>> tokenizer.create_vocab("cat.txt", freqThreshold=1, addSpecialTokens=False)
         >>> tokenizer.word2idx
-        >>> {'the': 0, "cat": 1, "jumps": 2, "over": 3, 
+        >>> {'cat': 0, "the": 1, "jumps": 2, "over": 3, 
         ...     "other": 4, ".": 5, "unhappy": 6, ",": 7}
 
         """
         # Reset (do not remove this)
         self.word2idx = {}
         self.idx2word = []
-        dictionary = dict()
-        with open(fname) as f:
-            for line in f:
-                words = self.preprocess(line).split()
-                for word in words:
-                    if word in dictionary:
-                        dictionary[word] += 1
-                    else:
-                        dictionary[word] = 1
-            
-        for keys in dictionary:
-            if dictionary.get(keys) < freqThreshold:
-                dictionary.pop(keys)
-            else:
-                IDs = self.convert_tokens_to_ids(keys)
-                self.word2idx[keys] = IDs
-                self.idx2word[IDs] = keys
+        self.bpe = None
+
+        self.count_vocab(fname, maxEntries=maxEntries, workers=workers)
+        self.build_vocab(freqThreshold, addSpecialTokens=addSpecialTokens)
+
+    def count_vocab(self, fname: str,
+                    maxEntries: int = None,
+                    workers: int = 1) -> Counter:
+        """
+        Count the words of fname (as create_vocab does) into self.counts, 
+        without building a vocabulary. This is the only pass over the 
+        file needed to compare thresholds with threshold_sweep and then 
+        build the vocabulary for the one chosen with build_vocab.
+
+        Args:
+            fname (str): Name of file to count.
+            maxEntries (int): Maximum number of distinct words to count 
+                              at once (see create_vocab). Default is None.
+            workers (int): Number of processes to count with 
+                           (see create_vocab). Default is 1.
 
+        Returns:
+            Counter: The count of every word (also kept as self.counts).
+        """
+        if maxEntries is not None and maxEntries < 2:
+            raise ValueError('maxEntries must be at least 2')
+        if workers > 1:
+            counts = self._count_file_parallel(fname, workers, maxEntries)
+        else:
+            with open(fname) as f:
+                counts = self._count_words(f, maxEntries)
+        self.counts = counts
+        return counts
 
-                    
-                
-        
+    def threshold_sweep(self, thresholds: Iterable[int],
+                        addSpecialTokens: bool = True) -> List[Dict]:
+        """
+        Report, for each threshold, the vocabulary create_vocab would 
+        build from self.counts: its size, the fraction of the counted 
+        tokens it covers and the fraction that would be unknown (<unk>). 
+        Only the histogram of counts (how many words occur each number 
+        of times) is walked, so any number of thresholds costs about as 
+        much as one.
+
+        Args:
+            thresholds (Iterable[int]): Values of freqThreshold to report.
+            addSpecialTokens (bool): Whether to count the special tokens 
+                                     in the vocabulary size (see 
+                                     create_vocab). Default is True.
+
+        Returns:
+            List[Dict]: For each threshold, in the order given, a dict with 
+                freqThreshold, vocab_size, coverage and oov_rate.
+
+        For example, with "cat.txt" as in create_vocab,
+            >>> tokenizer.count_vocab("cat.txt")
+            >>> tokenizer.threshold_sweep([0, 1])
+            >>> [{'freqThreshold': 0, 'vocab_size': 24, 'coverage': 1.0, 'oov_rate': 0.0},
+            ...  {'freqThreshold': 1, 'vocab_size': 12, 'coverage': 0.613..., 
+            ...   'oov_rate': 0.387...}]
+            >>> tokenizer.build_vocab(1)
+        """
+        if self.counts is None:
+            raise ValueError('no counts to sweep; call count_vocab first')
+        counts = self.counts
+        histogram = Counter(counts.values())
+        freqs = sorted(histogram)
+        # Number of words and of tokens with a count of at least freqs[i]
+        words = [0] * (len(freqs) + 1)
+        tokens = [0] * (len(freqs) + 1)
+        for i in range(len(freqs) - 1, -1, -1):
+            words[i] = words[i + 1] + histogram[freqs[i]]
+            tokens[i] = tokens[i + 1] + histogram[freqs[i]] * freqs[i]
+        total = tokens[0]
+        specials = list(dict.fromkeys([self.unk_token, self.pad_token,
+                                       self.bos_token, self.eos_token])) \
+            if addSpecialTokens else []
+
+        report = []
+        for threshold in thresholds:
+            kept = bisect_right(freqs, threshold)
+            coverage = tokens[kept] / total if total else 0.0
+            report.append({'freqThreshold': threshold,
+                           'vocab_size': words[kept] + sum(counts.get(token, 0) <= threshold
+                                                           for token in specials),
+                           'coverage': coverage,
+                           'oov_rate': 1 - coverage if total else 0.0})
+        return report
+
+    def build_vocab(self, freqThreshold: int = 30,
+                    addSpecialTokens: bool = True):
+        """
+        Build the vocabulary from self.counts (from count_vocab, 
+        create_vocab or update_vocab) without reading any file: the 
+        words that occur more than freqThreshold times, most frequent 
+        first, then the special tokens (if specified), exactly as 
+        create_vocab orders them, then any added tokens (see add_tokens) 
+        not among them.
+
+        Args:
+            freqThreshold (int): Threshold of frequency for 
+                                 inclusion in vocabulary. 
+                                 Default is 30.
+            addSpecialTokens (bool): Whether to add special tokens to 
+                                     the vocabulary. Default is True.
+        """
+        if self.counts is None:
+            raise ValueError('no counts to build from; call count_vocab first')
+        counts = self.counts
+        self.word2idx = {}
+        self.idx2word = []
+        self.bpe = None
+        self.freqThreshold = freqThreshold
+        self.vocabVersion = 1
+
+        words = [word for word, count in counts.items() if count > freqThreshold]
+        words.sort(key=counts.__getitem__, reverse=True)
+        if addSpecialTokens:
+            words.extend([self.unk_token, self.pad_token,
+                          self.bos_token, self.eos_token])
+
+        for word in words:
+            if word not in self.word2idx:
+                self.word2idx[word] = len(self.idx2word)
+                self.idx2word.append(word)
+        self._append_added_tokens()
+        self._vocab_changed()
+
+    def _append_added_tokens(self):
+        """
+        Appends the added tokens (see add_tokens) missing from a rebuilt 
+        vocabulary, which the trie would otherwise split out only to 
+        encode them as <unk>.
+        """
+        specials = {self.unk_token, self.bos_token, self.eos_token, self.pad_token}
+        for token in sorted(self.addedTokens.tokens):
+            if token not in specials and token not in self.word2idx:
+                self.word2idx[token] = len(self.idx2word)
+                self.idx2word.append(token)
+
+    def update_vocab(self, fname: str, workers: int = 1) -> int:
+        """
+        Update the vocabulary with the words of a new file (e.g., the 
+        newest shard of a corpus), without recounting the files it was 
+        built from. Only fname is counted; its counts are merged into 
+        self.counts, and every word of fname whose total count is now 
+        greater than self.freqThreshold and that is not yet in the 
+        vocabulary is appended to it (most frequent first), so the ids 
+        of existing tokens never change. vocabVersion is incremented. 
+        The time taken grows with the size of fname, not with the size 
+        of the data counted before.
+
+        The counts come from create_vocab (or from load_tokenizer, if 
+        they were saved with save_tokenizer). Without them, the counts 
+        start empty, so only words frequent enough in fname alone are 
+        added, and the threshold defaults to 30 as in create_vocab.
+
+        Args:
+            fname (str): Name of file to update the vocabulary from.
+            workers (int): Number of processes to count with 
+                           (see create_vocab). Default is 1.
+
+        Returns:
+            int: The number of tokens added.
+
+        For example, 
+            >>> tokenizer.create_vocab("day1.txt", freqThreshold=1)
+            >>> tokenizer.save_tokenizer("vocab.txt")
+            >>> tokenizer.load_tokenizer("vocab.txt")
+            >>> tokenizer.update_vocab("day2.txt")
+            >>> 12
+            >>> tokenizer.vocabVersion
+            >>> 2
+        """
+        if self.bpe is not None:
+            raise ValueError('update_vocab does not support BPE vocabularies; '
+                             'use create_bpe_vocab to retrain')
+        if workers > 1:
+            newCounts = self._count_file_parallel(fname, workers)
+        else:
+            with open(fname) as f:
+                newCounts = self._count_words(f)
+
+        if self.counts is None:
+            self.counts = Counter()
+        if self.freqThreshold is None:
+            self.freqThreshold = 30
+        counts = self.counts
+        counts.update(newCounts)
+
+        self._mutable_vocab()
+        words = [word for word in newCounts
+                 if counts[word] > self.freqThreshold and word not in self.word2idx]
+        words.sort(key=counts.__getitem__, reverse=True)
+        for word in words:
+            self.word2idx[word] = len(self.idx2word)
+            self.idx2word.append(word)
+        self.vocabVersion += 1
+        self._vocab_changed()
+        return len(words)
+
+    def _count_words(self, lines, maxEntries: int = None) -> Counter:
+        """
+        Counts the preprocessed tokens in an iterable of lines, 
+        pruning the least frequent entries whenever more than 
+        maxEntries distinct tokens are held (see create_vocab).
+        """
+        counts = Counter()
+        for line in lines:
+            counts.update(self.preprocess(line).split())
+            if maxEntries is not None and len(counts) > maxEntries:
+                _prune_counts(counts, maxEntries // 2)
+        return counts
+
+    def _count_file_parallel(self, fname: str, workers: int,
+                             maxEntries: int = None) -> Counter:
+        """
+        Counts the tokens in fname across a pool of worker processes 
+        (see create_vocab). Partial counts are merged in order, so the 
+        result also keeps the first-occurrence order of the tokens.
+        """
+        # Workers only preprocess, so they get a bare tokenizer rather 
+        # than self with its vocabulary and counts
+        counter = Tokenizer(lower=self.lower)
+        jobs = [(counter, fname, start, end, maxEntries)
+                for start, end in _line_aligned_ranges(fname, workers)]
+        if not jobs:
+            return Counter()
+        with multiprocessing.Pool(min(workers, len(jobs))) as pool:
+            partials = pool.map(_count_range, jobs)
+            while len(partials) > 1:
+                pairs = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+                partials = pool.map(_merge_counts, pairs)
+        return partials[0]
+
+    def create_bpe_vocab(self, fname: str,
+                         vocabSize: int = 8000,
+                         minFrequency: int = 2,
+                         addSpecialTokens: bool = True,
+                         workers: int = 1):
+        """
+        Create a subword (byte-pair encoding) vocabulary from a file, 
+        and switch the tokenizer to BPE mode. Words are preprocessed as 
+        for create_vocab, then split into characters, and the most 
+        frequent adjacent pair of symbols is merged repeatedly (see 
+        bpe.py). Subwords that continue a word start with "##", so a 
+        rare word becomes a few subwords instead of <unk>. encode, 
+        decode, save_tokenizer and load_tokenizer all work in BPE mode.
+
+        Args:
+            fname (str): Name of file to build vocabulary from.
+            vocabSize (int): Target vocabulary size, including the 
+                             characters and special tokens. 
+                             Default is 8000.
+            minFrequency (int): Stop merging once the most frequent pair 
+                                occurs fewer times than this. Default is 2.
+            addSpecialTokens (bool): Whether to add special tokens to 
+                                     the vocabulary. Default is True.
+            workers (int): Number of processes to count words with 
+                           (see create_vocab). Default is 1.
+
+        For example, 
+        >>> tokenizer = Tokenizer()
+        >>> tokenizer.create_bpe_vocab("cat.txt", vocabSize=60)
+        >>> tokenizer.word_tokenize("The catnip jumps")
+        >>> ['the', 'cat', '##n', '##i', '##p', 'jumps']
+        """
+        specials = [self.unk_token, self.pad_token, self.bos_token, self.eos_token]
+        if workers > 1:
+            counts = self._count_file_parallel(fname, workers)
+        else:
+            with open(fname) as f:
+                counts = self._count_words(f)
+        wordCounts = {word: count for word, count in counts.items()
+                      if word not in specials and word not in self.addedTokens}
+        self.counts = None
+        self.freqThreshold = None
+        self.vocabVersion = 1
+
+        numSymbols = len({symbol for word in wordCounts for symbol in word_symbols(word)})
+        numSpecial = len(specials) if addSpecialTokens else 0
+        symbols, merges = train_bpe(wordCounts, max(vocabSize - numSymbols - numSpecial, 0),
+                                    minFrequency)
+
+        words = symbols + [first + second[len(CONTINUATION):] for first, second in merges]
+        if addSpecialTokens:
+            words.extend(specials)
+        self.word2idx = {}
+        self.idx2word = []
+        for word in words:
+            if word not in self.word2idx:
+                self.word2idx[word] = len(self.idx2word)
+                self.idx2word.append(word)
+        self._append_added_tokens()
+        self.bpe = BPE(merges)
+        self._vocab_changed()
 
 
 if __name__ == "__main__":
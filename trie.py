@@ -0,0 +1,103 @@
+import re
+from typing import Iterable, Iterator, Tuple
+
+# Key marking the end of a token in a trie node (never a character).
+_END = ''
+
+_SPACE = re.compile(r'\s')
+
+
+class TokenTrie:
+    """
+    A character trie of added tokens, used to split them out of raw text
+    in one left-to-right pass with leftmost-longest matching. Candidate
+    starts are found with one compiled character class of the first
+    characters of all tokens, so text between matches is scanned by the
+    regex engine rather than one character at a time in Python, however
+    many tokens there are.
+
+    Attributes:
+        tokens (set): The tokens in the trie.
+        spaced (bool): Whether any of the tokens contains whitespace.
+
+    For example,
+        >>> trie = TokenTrie(['<s>', 'new york', 'new york city'])
+        >>> list(trie.split('<s>I love new york city!'))
+        >>> [(True, '<s>'), (False, 'I love '), (True, 'new york city'),
+        ...  (False, '!')]
+    """
+
+    def __init__(self, tokens: Iterable[str] = ()):
+        self.root = {}
+        self.tokens = set()
+        self.spaced = False
+        self._starts = None
+        for token in tokens:
+            self.add(token)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __contains__(self, token) -> bool:
+        return token in self.tokens
+
+    def add(self, token: str):
+        """
+        Adds token (a non-empty string) to the trie.
+        """
+        if not token:
+            raise ValueError('Added tokens must be non-empty strings')
+        node = self.root
+        for char in token:
+            node = node.setdefault(char, {})
+        node[_END] = True
+        self.tokens.add(token)
+        if _SPACE.search(token):
+            self.spaced = True
+        self._starts = None
+
+    def longest_match(self, text: str, start: int) -> int:
+        """
+        Returns the end of the longest token in text starting at start,
+        or -1 if no token starts there.
+        """
+        node = self.root
+        best = -1
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if _END in node:
+                best = i + 1
+        return best
+
+    def split(self, text: str) -> Iterator[Tuple[bool, str]]:
+        """
+        Splits text into segments, yielding (True, token) for each added
+        token and (False, segment) for the (non-empty) text between them.
+        """
+        if self._starts is None:
+            chars = sorted(self.root)
+            self._starts = re.compile('[' + ''.join(map(re.escape, chars)) + ']') \
+                if chars else None
+        if self._starts is None:
+            if text:
+                yield False, text
+            return
+
+        search = self._starts.search
+        last = 0
+        match = search(text)
+        while match:
+            start = match.start()
+            end = self.longest_match(text, start)
+            if end < 0:
+                match = search(text, start + 1)
+                continue
+            if last < start:
+                yield False, text[last:start]
+            yield True, text[start:end]
+            last = end
+            match = search(text, end)
+        if last < len(text):
+            yield False, text[last:]
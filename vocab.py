@@ -0,0 +1,260 @@
+import mmap
+import struct
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from itertools import repeat
+from typing import List, Optional
+
+# Binary vocabulary layout (native byte order), all sections contiguous:
+#   header   MAGIC, version, number of tokens n, number of hash buckets m
+#   offsets  n + 1 uint64 byte offsets of each token in the blob
+#   buckets  m uint32 hash slots holding token id + 1 (0 is empty)
+#   blob     the UTF-8 bytes of every token, one after another
+# Lookups hash the UTF-8 bytes with crc32 and probe linearly, so the
+# file can be used straight from mmap without building any dict.
+MAGIC = b'\x93TOKVOCB'
+VERSION = 1
+HEADER = struct.Struct('8sIII4x')
+
+
+def is_binary_vocab(fname: str) -> bool:
+    """
+    Returns whether fname starts with the binary vocabulary magic bytes.
+    """
+    with open(fname, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def save_binary_vocab(fname: str, tokens: List[str]):
+    """
+    Writes tokens (i.e., idx2word) to fname in the binary format above,
+    including a prebuilt hash index mapping each token to its first id.
+    """
+    blobs = [token.encode('utf-8') for token in tokens]
+
+    offsets = array('Q', [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    numBuckets = 1
+    while numBuckets < 2 * len(blobs):
+        numBuckets *= 2
+    mask = numBuckets - 1
+    buckets = array('I', bytes(4 * numBuckets))
+    for idx, blob in enumerate(blobs):
+        h = zlib.crc32(blob) & mask
+        while buckets[h]:
+            if blobs[buckets[h] - 1] == blob:
+                break
+            h = (h + 1) & mask
+        else:
+            buckets[h] = idx + 1
+
+    with open(fname, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(blobs), numBuckets))
+        f.write(offsets.tobytes())
+        f.write(buckets.tobytes())
+        f.write(b''.join(blobs))
+
+
+class BinaryVocab:
+    """
+    A binary vocabulary file opened with mmap. Opening only reads the
+    header; tokens and ids are decoded on demand through the word2idx
+    and idx2word views. Pickling reopens the file by name, so worker
+    processes share the same pages rather than copies of the vocabulary.
+
+    Attributes:
+        fname (str): Name of the vocabulary file.
+        word2idx (MappedWord2Idx): Read-only mapping of tokens to ids.
+        idx2word (MappedIdx2Word): Read-only sequence of tokens by id.
+    """
+
+    def __init__(self, fname: str):
+        self.fname = fname
+        with open(fname, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, numBuckets = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f'{fname} is not a binary vocabulary file')
+        if version != VERSION:
+            raise ValueError(f'Unsupported binary vocabulary version {version}')
+
+        view = memoryview(self._mmap)
+        start = HEADER.size
+        end = start + 8 * (count + 1)
+        self.offsets = view[start:end].cast('Q')
+        start, end = end, end + 4 * numBuckets
+        self.buckets = view[start:end].cast('I')
+        self.blob = view[end:]
+        self.count = count
+        self.mask = numBuckets - 1
+
+        self.word2idx = MappedWord2Idx(self)
+        self.idx2word = MappedIdx2Word(self)
+
+    def __reduce__(self):
+        return (BinaryVocab, (self.fname,))
+
+    def find(self, token: str) -> int:
+        """
+        Returns the id of token, or -1 if it is not in the vocabulary.
+        """
+        data = token.encode('utf-8')
+        offsets, buckets, blob, mask = self.offsets, self.buckets, self.blob, self.mask
+        h = zlib.crc32(data) & mask
+        while True:
+            slot = buckets[h]
+            if not slot:
+                return -1
+            idx = slot - 1
+            if blob[offsets[idx]:offsets[idx + 1]] == data:
+                return idx
+            h = (h + 1) & mask
+
+
+class MappedWord2Idx(Mapping):
+    """
+    Read-only word2idx backed by the hash index of a BinaryVocab.
+    """
+
+    def __init__(self, vocab: BinaryVocab):
+        self.vocab = vocab
+
+    def __reduce__(self):
+        return (MappedWord2Idx, (self.vocab,))
+
+    def __getitem__(self, token: str) -> int:
+        idx = self.vocab.find(token) if type(token) == str else -1
+        if idx < 0:
+            raise KeyError(token)
+        return idx
+
+    def get(self, token: str, default=None):
+        idx = self.vocab.find(token) if type(token) == str else -1
+        return default if idx < 0 else idx
+
+    def __contains__(self, token) -> bool:
+        return type(token) == str and self.vocab.find(token) >= 0
+
+    def __iter__(self):
+        return iter(self.vocab.idx2word)
+
+    def __len__(self) -> int:
+        return self.vocab.count
+
+
+class PackedIdx2Word(Sequence):
+    """
+    A read-only idx2word that keeps every token in one contiguous UTF-8
+    buffer with an array of offsets, and decodes a token only when it
+    is indexed. This costs the token bytes plus 8 bytes per token,
+    instead of a Python str object per token. Optionally, the most
+    recently decoded tokens are kept in a small LRU cache, so hot
+    tokens (e.g., "the" or ",") are decoded once.
+
+    Attributes:
+        blob (bytes | memoryview): The UTF-8 bytes of all tokens.
+        offsets (array | memoryview): uint64 offsets of each token in blob,
+                                      with a final offset for the end.
+        cacheSize (int): Number of decoded tokens to keep. Default is 0
+                         (no cache).
+    """
+
+    def __init__(self, blob, offsets, cacheSize: int = 0):
+        self.blob = blob
+        self.offsets = offsets
+        self.count = len(offsets) - 1
+        self.cacheSize = cacheSize
+        self._cache = OrderedDict()
+
+    @classmethod
+    def from_tokens(cls, tokens: List[str], cacheSize: int = 0):
+        """
+        Packs a list of tokens (e.g., a list idx2word).
+        """
+        blobs = [token.encode('utf-8') for token in tokens]
+        offsets = array('Q', [0])
+        for blob in blobs:
+            offsets.append(offsets[-1] + len(blob))
+        return cls(b''.join(blobs), offsets, cacheSize)
+
+    def __reduce__(self):
+        return (PackedIdx2Word, (bytes(self.blob), array('Q', self.offsets),
+                                 self.cacheSize))
+
+    def __getitem__(self, idx):
+        if type(idx) == slice:
+            return [self[i] for i in range(*idx.indices(self.count))]
+        if idx < 0:
+            idx += self.count
+        if not 0 <= idx < self.count:
+            raise IndexError('token id out of range')
+        if not self.cacheSize:
+            return str(self.blob[self.offsets[idx]:self.offsets[idx + 1]], 'utf-8')
+
+        cache = self._cache
+        token = cache.get(idx)
+        if token is not None:
+            cache.move_to_end(idx)
+            return token
+        token = str(self.blob[self.offsets[idx]:self.offsets[idx + 1]], 'utf-8')
+        cache[idx] = token
+        if len(cache) > self.cacheSize:
+            cache.popitem(last=False)
+        return token
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class MappedIdx2Word(PackedIdx2Word):
+    """
+    Read-only idx2word that decodes tokens from the string blob of a
+    BinaryVocab when indexed.
+    """
+
+    def __init__(self, vocab: BinaryVocab, cacheSize: int = 0):
+        super().__init__(vocab.blob, vocab.offsets, cacheSize)
+        self.vocab = vocab
+
+    def __reduce__(self):
+        return (MappedIdx2Word, (self.vocab, self.cacheSize))
+
+
+class FrozenLookup:
+    """
+    A snapshot of a vocabulary for token to id lookups, built once after
+    it changes: the bound get method of word2idx (a dict lookup, or a
+    probe of the mmap hash index for a binary vocabulary) and the ids of
+    the special tokens, so no lookup resolves them again.
+
+    Attributes:
+        word2idx (Mapping): The vocabulary it was built from.
+        size (int): Number of tokens in word2idx when it was built.
+        unk, bos, eos, pad (str): The special tokens it was built for.
+        unk_id, bos_id, eos_id, pad_id (int): Ids of the special tokens,
+                                              or None if not in word2idx.
+        special_ids (frozenset): The bos, eos and pad ids in word2idx.
+        detokens (List[str]): Strings decode_to_text joins for each id,
+                              built on first use. Default is None.
+    """
+
+    def __init__(self, word2idx: Mapping, unk: str, bos: str, eos: str, pad: str):
+        self.word2idx = word2idx
+        self.size = len(word2idx)
+        self.unk, self.bos, self.eos, self.pad = unk, bos, eos, pad
+        self.get = get = word2idx.get
+        self.unk_id, self.bos_id, self.eos_id, self.pad_id = map(get, (unk, bos, eos, pad))
+        self.special_ids = frozenset(idx for idx in (self.bos_id, self.eos_id, self.pad_id)
+                                     if idx is not None)
+        self.detokens = None
+
+    def ids(self, tokens) -> List[Optional[int]]:
+        """
+        Returns the id of each of tokens (unk_id if not in word2idx).
+        """
+        return list(map(self.get, tokens, repeat(self.unk_id)))